@@ -0,0 +1,187 @@
+"""
+Offline throughput benchmark: runs the real mode runners against csod_mock.py.
+
+    python csod_bench.py --rows 50 --latency 0.15 --workers 2
+    python csod_bench.py --modes review pwd --http --json bench.json
+    python csod_bench.py --baseline bench.json --max-regression 10   # exit 1 if slower
+
+Reports rows/minute and p50/p95 per-row latency per mode, plus "silent" rows:
+reported as successful although the mock did not store the requested value.
+Needs Chrome like the toolkit itself (headless by default).
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import random
+import argparse
+import tempfile
+from typing import Dict, List
+
+import openpyxl
+
+from csod_mock import MockCsod, LANGUAGES
+
+MODES = ("review", "lang", "course", "pwd")
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile; 0.0 for no samples."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, min(len(ordered), math.ceil(pct / 100 * len(ordered))) - 1)]
+
+
+def build_workbook(path: str, mode: str, mock: MockCsod, rows: int, rng: random.Random) -> Dict[str, tuple]:
+    """Write the input workbook for mode; returns key -> expected values for verification."""
+    titles = [c["title"] for c in mock.courses.values()]
+    users = list(mock.users)
+    wb = openpyxl.Workbook(); ws = wb.active
+    expected = {}
+    header = {"review": ("CourseName", "ReviewDate"), "lang": ("CourseName", "Languages"),
+              "course": ("CourseName", "ReviewDate", "Languages"), "pwd": ("Username", "NewPassword")}[mode]
+    ws.append(header)
+    keys = rng.sample(users if mode == "pwd" else titles, min(rows, len(users if mode == "pwd" else titles)))
+    for key in keys:
+        date = f"{rng.randint(1, 12):02d}/{rng.randint(1, 28):02d}/{rng.randint(2026, 2030)}"
+        langs = rng.sample(LANGUAGES[1:], rng.randint(1, 3))
+        if mode == "review":
+            ws.append((key, date)); expected[key] = (date, None)
+        elif mode == "lang":
+            ws.append((key, ", ".join(langs))); expected[key] = (None, langs)
+        elif mode == "course":
+            ws.append((key, date, ", ".join(langs))); expected[key] = (date, langs)
+        else:
+            pwd = f"Bench-{rng.getrandbits(32):08x}!"
+            ws.append((key, pwd)); expected[key] = (pwd,)
+    wb.save(path)
+    return expected
+
+
+def verify(mode: str, mock: MockCsod, expected: Dict[str, tuple], succeeded: List[str]) -> int:
+    """Rows reported as successful whose change is not in the mock's state."""
+    silent = 0
+    with mock.lock:
+        for key in succeeded:
+            if mode == "pwd":
+                ok = (mock.users.get(key) or [None])[-1] == expected[key][0]
+            else:
+                c = mock.course_by_title(key) or {}
+                date, langs = expected[key]
+                ok = (not date or c.get("date") == date) and all(l in c.get("langs", []) for l in langs or [])
+            silent += not ok
+    return silent
+
+
+def run_mode(core, browser, mock: MockCsod, mode: str, args, workdir: str, rng: random.Random, pass_no: int) -> dict:
+    path = os.path.join(workdir, f"{mode}_{pass_no}.xlsx")
+    expected = build_workbook(path, mode, mock, args.rows, rng)
+    latencies: List[float] = []
+    flog = core._file_logger(f"bench.{mode}")
+
+    def log(msg):
+        flog.info(msg)
+        if args.verbose:
+            print(f"  [{mode}] {msg}", flush=True)
+
+    runner = core.RUNNERS[mode](browser, log=log, on_row=lambda key, status, msg, secs, done, total: latencies.append(secs))
+    runner.workers = args.workers
+    runner.use_http = args.http
+    runner.trace = args.trace
+    t0 = time.perf_counter()
+    status = runner.run(path, on_error=lambda title, text: log(f"❌ {title}: {text}"))
+    wall = time.perf_counter() - t0
+    if status != core.RUN_OK:
+        raise SystemExit(f"❌ {mode}: run ended with status '{status}' (is Chrome available?)")
+    done = len(runner.success_items) + len(runner.failed_items) + len(runner.skipped_items)
+    return {
+        "mode": mode, "pass": pass_no, "rows": done, "ok": len(runner.success_items), "failed": len(runner.failed_items),
+        "skipped": len(runner.skipped_items),
+        "silent": verify(mode, mock, expected, runner.success_items),
+        "rows_per_min": round(done / wall * 60, 1) if wall else 0.0,
+        "p50": round(percentile(latencies, 50), 3), "p95": round(percentile(latencies, 95), 3), "wall": round(wall, 2),
+    }
+
+
+def print_table(results: List[dict]):
+    print(f"{'mode':<8}{'pass':>5}{'rows':>6}{'ok':>6}{'skip':>6}{'fail':>6}{'silent':>7}{'rows/min':>10}{'p50 s':>8}{'p95 s':>8}{'wall s':>8}")
+    for r in results:
+        print(f"{r['mode']:<8}{r['pass']:>5}{r['rows']:>6}{r['ok']:>6}{r['skipped']:>6}{r['failed']:>6}{r['silent']:>7}"
+              f"{r['rows_per_min']:>10.1f}{r['p50']:>8.2f}{r['p95']:>8.2f}{r['wall']:>8.1f}")
+
+
+def compare(results: List[dict], baseline_path: str, max_regression: float) -> bool:
+    """True when no mode/pass lost more than max_regression % rows/min against the baseline."""
+    with open(baseline_path, encoding="utf-8") as f:
+        base = {(r["mode"], r["pass"]): r for r in json.load(f)["results"]}
+    ok = True
+    for r in results:
+        b = base.get((r["mode"], r["pass"]))
+        if not b or not b["rows_per_min"]:
+            continue
+        change = (r["rows_per_min"] - b["rows_per_min"]) / b["rows_per_min"] * 100
+        flag = change < -max_regression
+        ok &= not flag
+        print(f"{'❌' if flag else '✅'} {r['mode']} pass {r['pass']}: {b['rows_per_min']:.1f} -> {r['rows_per_min']:.1f} rows/min ({change:+.1f}%)")
+    return ok
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Benchmark the toolkit's modes against the local mock CSOD")
+    ap.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    ap.add_argument("--rows", type=int, default=30, help="rows per mode")
+    ap.add_argument("--passes", type=int, default=1, help="repeat each mode (pass 2+ runs with a warm course index)")
+    ap.add_argument("--workers", type=int, default=1)
+    ap.add_argument("--http", action="store_true", help="enable the HTTP engine")
+    ap.add_argument("--no-index", action="store_true", help="disable the course index cache")
+    ap.add_argument("--headed", action="store_true", help="show the browser window")
+    ap.add_argument("--latency", type=float, default=0.1, help="mock seconds per request")
+    ap.add_argument("--jitter", type=float, default=0.05)
+    ap.add_argument("--error-rate", type=float, default=0.0)
+    ap.add_argument("--reuse-rate", type=float, default=0.0)
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--json", help="write results to this file (usable as a later --baseline)")
+    ap.add_argument("--baseline", help="results JSON of an earlier run to compare against")
+    ap.add_argument("--max-regression", type=float, default=10.0, help="allowed rows/min drop in percent")
+    ap.add_argument("--trace", action="store_true", help="also write per-step trace files (traces/)")
+    ap.add_argument("--verbose", action="store_true", help="echo the runners' log lines")
+    args = ap.parse_args(argv)
+
+    mock = MockCsod(courses=max(args.rows, 50), users=max(args.rows, 50), latency=args.latency, jitter=args.jitter,
+                    error_rate=args.error_rate, reuse_rate=args.reuse_rate, seed=args.seed)
+    os.environ["CSOD_BASE_URL"] = mock.start()
+    import csod_core as core  # after CSOD_BASE_URL is set, so the runners target the mock
+
+    rng = random.Random(args.seed)
+    results = []
+    with tempfile.TemporaryDirectory(ignore_cleanup_errors=True) as workdir:
+        core.RESULTS_DIR = workdir
+        core.LANGUAGE_CATALOG = core.LanguageCatalog(os.path.join(workdir, "language_catalog.json"))
+        core.COURSE_INDEX = None if args.no_index else core.CourseIndex(os.path.join(workdir, "index.sqlite3"), core.COURSE_INDEX_TTL_DAYS)
+        core.RUN_HISTORY = None  # mock runs must not become the baseline of real ones
+        browser = core.BrowserManager(headless=not args.headed)
+        try:
+            for pass_no in range(1, args.passes + 1):
+                for mode in args.modes:
+                    results.append(run_mode(core, browser, mock, mode, args, workdir, rng, pass_no))
+                    print(f"✔ {mode} pass {pass_no}: {results[-1]['rows_per_min']} rows/min", flush=True)
+        finally:
+            browser.close()
+            mock.stop()
+
+    print()
+    print_table(results)
+    print(f"mock: {mock.stats}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"settings": vars(args), "mock": mock.stats, "results": results}, f, indent=2)
+    if args.baseline:
+        return 0 if compare(results, args.baseline, args.max_regression) else 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,349 @@
+"""
+Headless command-line runner for scheduled / overnight batches (no tkinter).
+
+    python Automate.py login [--profile-dir DIR]
+        One-time: opens a visible Chrome on the persisted profile so you can log in.
+    python Automate.py run --mode review --input courses.xlsx --report results.xlsx
+        Runs a mode in headless Chrome re-using that profile's session.
+    python Automate.py feed --input passwords.xlsx [--out-dir feeds]
+        Writes a Username | NewPassword workbook as CSOD user-load files (no browser).
+    python Automate.py shard --mode review --input courses.xlsx --shards 4 --report results.xlsx
+        Splits the workbook by a stable hash of the key and runs one 'run' process (own
+        Chrome) per shard; the shard results are merged into one report.
+    python Automate.py history [--mode review] [--last 20] [--run ID] [--check]
+        Lists recorded runs (rows/minute, row time, failure rate) and flags the ones
+        that are slower or fail more than the runs before them.
+
+Progress is printed to stdout as JSON lines ({"event": "row", ...}); the full log
+also goes to logs/toolkit.log. Exit codes: see EXIT_* below.
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import signal
+import argparse
+import threading
+import subprocess
+
+from csod_core import (
+    BrowserManager, RUNNERS, RUN_LOGIN_FAILED, RUN_INPUT_FAILED, RUN_SESSION_LOST, RUN_INCOMPLETE, CLI_PROFILE_DIR, POOL_MAX_WORKERS,
+    FEED_DIR, FEED_MAX_ROWS, SHARD_DIR, build_user_feed, split_workbook, shard_results_path, claim_shard,
+    release_shard, remove_shards, merge_results, _file_logger, RUN_HISTORY,
+)
+
+EXIT_OK           = 0    # every row succeeded
+EXIT_ROW_FAILURES = 1    # run completed, some rows failed (see --failed-report)
+EXIT_USAGE        = 2    # bad arguments / unreadable workbook
+EXIT_LOGIN        = 3    # no valid CSOD session (run the 'login' command)
+EXIT_ERROR        = 4    # unexpected error (browser could not start, ...)
+EXIT_REGRESSION   = 5    # history --check: the newest run is slower / fails more than its baseline
+EXIT_CANCELLED    = 130  # interrupted (Ctrl+C / SIGTERM); journal allows resuming
+
+
+def emit(event: str, **fields):
+    """One JSON object per line on stdout."""
+    print(json.dumps({"event": event, "ts": round(time.time(), 3), **fields}, ensure_ascii=False), flush=True)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(prog="Automate.py", description="CSOD admin toolkit – headless batch runner")
+    sub = p.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="run one mode over a workbook")
+    run.add_argument("--mode", required=True, choices=sorted(RUNNERS), help="review | lang | course | pwd")
+    run.add_argument("--input", required=True, help="input workbook (.xlsx)")
+    run.add_argument("--report", required=True, help="full results report (.xlsx or .csv)")
+    run.add_argument("--failed-report", help="optional report of failed rows only (.xlsx or .csv)")
+    run.add_argument("--workers", type=int, default=1, help=f"parallel browser sessions (max {POOL_MAX_WORKERS})")
+    run.add_argument("--http", action="store_true", help="use the HTTP engine where possible")
+    run.add_argument("--profile-dir", default=CLI_PROFILE_DIR, help="Chrome profile holding the CSOD login")
+    run.add_argument("--headed", action="store_true", help="show the browser window (default: headless)")
+    run.add_argument("--restart", action="store_true", help="ignore the checkpoint journal and redo every row")
+    run.add_argument("--trace", action="store_true", help="record per-step timings and write them to traces/")
+    run.add_argument("--dry-run", action="store_true", help="compare only: report planned changes, save nothing")
+
+    feed = sub.add_parser("feed", help="write a password workbook as CSOD user-load files")
+    feed.add_argument("--input", required=True, help="Username | NewPassword workbook (.xlsx)")
+    feed.add_argument("--out-dir", default=FEED_DIR, help="folder for the feed files")
+    feed.add_argument("--max-rows", type=int, default=FEED_MAX_ROWS, help="rows per feed file")
+
+    shard = sub.add_parser("shard", help="run one mode as N parallel processes (one Chrome each) and merge the results")
+    shard.add_argument("--mode", required=True, choices=sorted(RUNNERS), help="review | lang | course | pwd")
+    shard.add_argument("--input", required=True, help="input workbook (.xlsx)")
+    shard.add_argument("--report", required=True, help="merged results report (.xlsx or .csv)")
+    shard.add_argument("--failed-report", help="optional merged report of failed rows only (.xlsx or .csv)")
+    shard.add_argument("--shards", type=int, default=2, help="number of shards (same N on every host)")
+    shard.add_argument("--only", type=int, nargs="+", metavar="I", help="run only these shards (1..N), e.g. per host")
+    shard.add_argument("--shard-dir", default=SHARD_DIR, help="shard workbooks, results and locks (may be shared)")
+    shard.add_argument("--profile-dir", default=CLI_PROFILE_DIR, help="logged-in Chrome profile, copied per shard")
+    shard.add_argument("--http", action="store_true", help="use the HTTP engine where possible")
+    shard.add_argument("--dry-run", action="store_true", help="compare only: report planned changes, save nothing")
+    shard.add_argument("--restart", action="store_true", help="ignore the shards' checkpoint journals")
+    shard.add_argument("--force", action="store_true", help="take over shards whose lock file was left behind")
+
+    history = sub.add_parser("history", help="list recorded runs with rows/minute and failure rate; flag regressions")
+    history.add_argument("--mode", choices=sorted(RUNNERS), help="only runs of this mode")
+    history.add_argument("--last", type=int, default=20, help="number of runs to list (newest)")
+    history.add_argument("--run", type=int, metavar="ID", help="one run in detail: step timings and top errors")
+    history.add_argument("--check", action="store_true", help=f"exit {EXIT_REGRESSION} if the newest listed run is flagged")
+
+    login = sub.add_parser("login", help="log in once interactively to populate the profile")
+    login.add_argument("--profile-dir", default=CLI_PROFILE_DIR, help="Chrome profile to store the login in")
+    login.add_argument("--mode", default="review", choices=sorted(RUNNERS), help="admin page to verify the login on")
+    return p
+
+
+def cmd_login(args) -> int:
+    browser = BrowserManager(headless=False, profile_dir=args.profile_dir)
+    runner = RUNNERS[args.mode](browser)
+    errors = []
+    try:
+        ok = browser.navigate_and_login(runner.url, runner.ready_locator, "Log in to LKQYou PROD in the Chrome window.",
+                                        prompt=lambda title, text: emit("prompt", msg=text),
+                                        on_error=lambda title, text: errors.append(text))
+    finally:
+        browser.close()
+    if not ok:
+        emit("error", msg="; ".join(errors) or "login failed")
+        return EXIT_LOGIN
+    emit("login", ok=True, profile_dir=args.profile_dir)
+    return EXIT_OK
+
+
+def cmd_run(args) -> int:
+    if not os.path.isfile(args.input):
+        emit("error", msg=f"input workbook not found: {args.input}")
+        return EXIT_USAGE
+    flog = _file_logger(f"cli.{args.mode}")
+
+    def log(msg: str):
+        flog.info(msg)
+        emit("log", msg=msg)
+
+    def on_row(key, status, msg, secs, done, total):
+        snap = runner.progress.snapshot()
+        emit("row", key=key, status=status, msg=msg, secs=round(secs, 3), done=done, total=total,
+             rate_per_min=snap["rate_per_min"], eta_secs=snap["eta_secs"])
+
+    browser = BrowserManager(headless=not args.headed, profile_dir=args.profile_dir)
+    runner = RUNNERS[args.mode](browser, log=log, on_row=on_row)
+    runner.workers = args.workers
+    runner.use_http = args.http
+    runner.trace = args.trace
+    runner.dry_run = args.dry_run
+    if args.report.lower().endswith(".csv"):
+        runner.results_target = args.report  # stream straight into the report
+    completed = {} if args.dry_run else runner.open_journal(args.input)  # a dry run saves nothing to resume
+    if completed and args.restart:
+        runner.journal.discard()
+    elif completed:
+        runner.resume = completed
+    emit("start", mode=args.mode, input=args.input, resume=len(runner.resume))
+
+    def stop(signum, frame):
+        """First Ctrl+C / SIGTERM finishes the current row(s) and stops; a second one aborts."""
+        if runner.stop_flag:
+            raise KeyboardInterrupt
+        runner.stop_flag = True
+        log("⚠️ Cancellation requested...")
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    errors = []
+    try:
+        status = runner.run(args.input, prompt=None, on_error=lambda title, text: errors.append(text))
+    except KeyboardInterrupt:
+        status = RUN_OK
+    except Exception as e:
+        emit("error", msg=str(e))
+        return EXIT_ERROR
+    finally:
+        browser.close()
+
+    if status == RUN_LOGIN_FAILED:
+        emit("error", msg="; ".join(errors) or "login failed")
+        return EXIT_LOGIN
+    if status == RUN_INPUT_FAILED:
+        emit("error", msg="workbook could not be read")
+        return EXIT_USAGE
+
+    runner.export_full(args.report)
+    if args.failed_report:
+        runner.export_failed(args.failed_report)
+    emit("summary", success=len(runner.success_items), failed=len(runner.failed_items),
+         skipped=len(runner.skipped_items), planned=len(runner.planned_items),
+         cancelled=runner.stop_flag, report=args.report, failed_report=args.failed_report,
+         unprocessed=runner.unprocessed, stages=runner.pipeline.snapshot() if runner.pipeline else [])
+    if runner.stop_flag:
+        return EXIT_CANCELLED
+    if status == RUN_SESSION_LOST:  # rows left over: the session expired and could not be restored
+        emit("error", msg="; ".join(errors) or f"session lost; {runner.unprocessed} row(s) not processed")
+        return EXIT_LOGIN
+    if status == RUN_INCOMPLETE:
+        emit("error", msg=f"no working browser left; {runner.unprocessed} row(s) not processed")
+        return EXIT_ERROR
+    return EXIT_ROW_FAILURES if runner.failed_items else EXIT_OK
+
+
+def cmd_feed(args) -> int:
+    if not os.path.isfile(args.input):
+        emit("error", msg=f"input workbook not found: {args.input}")
+        return EXIT_USAGE
+    flog = _file_logger("cli.feed")
+
+    def log(msg: str):
+        flog.info(msg)
+        emit("log", msg=msg)
+
+    try:
+        report = build_user_feed(args.input, args.out_dir, log, max_rows=args.max_rows)
+    except Exception as e:
+        emit("error", msg=f"workbook could not be read: {e}")
+        return EXIT_USAGE
+    for user, reason in report.rejected:
+        emit("row", key=user, status="failed", msg=reason)
+    emit("summary", written=report.written, files=report.files, rejected=len(report.rejected), problems=report.problems)
+    return EXIT_ROW_FAILURES if report.rejected or report.problems else EXIT_OK
+
+
+def _shard_profile(base: str, shard: int) -> str:
+    """Fresh copy of the logged-in profile for one shard (Chrome cannot share a profile between processes)."""
+    dest = f"{base.rstrip(os.sep)}-shard{shard}"
+    shutil.rmtree(dest, ignore_errors=True)
+    if os.path.isdir(base):
+        shutil.copytree(base, dest, ignore=shutil.ignore_patterns("Singleton*", "*Cache*", "lockfile"))
+    return dest
+
+
+def cmd_shard(args) -> int:
+    if not os.path.isfile(args.input):
+        emit("error", msg=f"input workbook not found: {args.input}")
+        return EXIT_USAGE
+    if args.shards < 1 or any(not 1 <= i <= args.shards for i in args.only or ()):
+        emit("error", msg="--shards must be >= 1 and --only values within 1..N")
+        return EXIT_USAGE
+    flog = _file_logger("cli.shard")
+
+    def log(msg: str):
+        flog.info(msg)
+        emit("log", msg=msg)
+
+    runner_cls = RUNNERS[args.mode]
+    try:
+        paths = split_workbook(args.input, runner_cls.columns, args.shards, args.shard_dir, log, runner_cls.require_any)
+    except Exception as e:
+        emit("error", msg=f"workbook could not be read: {e}")
+        return EXIT_USAGE
+    if runner_cls.has_secrets:
+        log("⚠️ Shard workbooks contain plain-text passwords: they are deleted once this host's shards are merged.")
+    claimed = []
+    try:
+        return _run_shards(args, runner_cls, paths, log, claimed)
+    finally:
+        if runner_cls.has_secrets and claimed:
+            remove_shards(claimed, log)  # shards locked by other hosts are theirs to delete
+
+
+def _run_shards(args, runner_cls, paths, log, claimed: list) -> int:
+    procs = {}
+    for i in args.only or range(1, args.shards + 1):
+        path = paths[i - 1]
+        if not claim_shard(path, args.force):
+            log(f"⏭️ Shard {i} is locked by another process or host ({path}.lock); not started here.")
+            continue
+        claimed.append(path)
+        cmd = [sys.executable, os.path.abspath(__file__), "run", "--mode", args.mode, "--input", path,
+               "--report", shard_results_path(path), "--profile-dir", _shard_profile(args.profile_dir, i)]
+        cmd += [flag for flag, on in (("--http", args.http), ("--dry-run", args.dry_run), ("--restart", args.restart)) if on]
+        procs[i] = subprocess.Popen(cmd, stdout=subprocess.PIPE, text=True, encoding="utf-8", errors="replace")
+    emit("start", mode=args.mode, input=args.input, shards=args.shards, running=sorted(procs))
+
+    out_lock = threading.Lock()
+
+    def relay(shard, proc):
+        """Re-emit a shard's JSON lines tagged with its number."""
+        for line in proc.stdout:
+            try:
+                event = json.loads(line)
+            except ValueError:
+                event = {"event": "log", "msg": line.rstrip()}
+            with out_lock:
+                print(json.dumps({**event, "shard": shard}, ensure_ascii=False), flush=True)
+
+    def stop(signum, frame):
+        """Ctrl+C reaches the shard processes directly; SIGTERM is passed on (they finish their rows)."""
+        if signum == signal.SIGTERM:
+            for proc in procs.values():
+                proc.terminate()
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    relays = [threading.Thread(target=relay, args=(i, p), daemon=True) for i, p in procs.items()]
+    for t in relays: t.start()
+    codes = {}
+    for i, proc in procs.items():
+        codes[i] = proc.wait()
+        release_shard(paths[i - 1])
+    for t in relays: t.join()
+
+    results = [shard_results_path(p) for p in paths if os.path.exists(shard_results_path(p))]
+    missing = [i for i, p in enumerate(paths, 1) if not os.path.exists(shard_results_path(p))]
+    if missing:
+        log(f"⚠️ No results yet for shard(s) {', '.join(map(str, missing))}; the merged report leaves them out.")
+    counts = merge_results(results, args.report, runner_cls.full_header, args.failed_report, runner_cls.failed_header)
+    emit("summary", **{k.lower(): v for k, v in counts.items()}, shard_exit_codes=codes, missing=missing,
+         report=args.report, failed_report=args.failed_report)
+    if any(c == EXIT_LOGIN for c in codes.values()):
+        return EXIT_LOGIN
+    if any(c == EXIT_CANCELLED for c in codes.values()):
+        return EXIT_CANCELLED
+    if any(c not in (EXIT_OK, EXIT_ROW_FAILURES) for c in codes.values()):
+        return EXIT_ERROR
+    return EXIT_ROW_FAILURES if counts.get("Failed") or missing else EXIT_OK
+
+
+def cmd_history(args) -> int:
+    if RUN_HISTORY is None:
+        emit("error", msg="run history is disabled (RUN_HISTORY_ENABLED)")
+        return EXIT_USAGE
+    if args.run is not None:
+        run = RUN_HISTORY.run(args.run)
+        if not run:
+            emit("error", msg=f"no run #{args.run} in {RUN_HISTORY.path}")
+            return EXIT_USAGE
+        flags = RUN_HISTORY.regressions(args.run)
+        emit("run", **run, failure_rate=round(run["failed"] / max(run["processed"], 1), 3), regressions=flags)
+        for step in RUN_HISTORY.steps(args.run):
+            emit("step", **step)
+        for err in RUN_HISTORY.top_errors(args.run):
+            emit("errors", **err)
+        return EXIT_REGRESSION if args.check and flags else EXIT_OK
+    runs = RUN_HISTORY.runs(args.mode, args.last)
+    flagged = []
+    for run in reversed(runs):  # oldest first, like a log
+        flags = RUN_HISTORY.regressions(run["id"])
+        if flags:
+            flagged.append(run["id"])
+        emit("run", **run, failure_rate=round(run["failed"] / max(run["processed"], 1), 3), regressions=flags)
+    emit("summary", runs=len(runs), regressed=flagged, db=RUN_HISTORY.path)
+    return EXIT_REGRESSION if args.check and runs and runs[0]["id"] in flagged else EXIT_OK
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.command == "login":
+        return cmd_login(args)
+    if args.command == "feed":
+        return cmd_feed(args)
+    if args.command == "shard":
+        return cmd_shard(args)
+    if args.command == "history":
+        return cmd_history(args)
+    return cmd_run(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
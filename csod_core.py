@@ -0,0 +1,3077 @@
+"""
+CSOD toolkit core: configuration, browser session, wait engine, workbook
+ingestion, per-mode runners and exports.
+
+Everything here is UI-free (no tkinter import), so it is shared by the Tk app
+(csod_gui.py) and the headless command-line runner (csod_cli.py).
+"""
+
+import io
+import os
+import re
+import csv
+import json
+import datetime
+import gzip
+import time
+import socket
+import sqlite3
+import shutil
+import hashlib
+import logging
+import logging.handlers
+import heapq
+import queue
+import threading
+import collections
+import urllib.parse
+import http.client
+import html as html_lib
+from html.parser import HTMLParser
+from http.cookies import SimpleCookie
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Tuple, Optional
+
+import openpyxl
+
+try:
+    import psutil  # optional: browser memory (RSS) for recycling decisions
+except ImportError:
+    psutil = None
+
+from selenium import webdriver
+from selenium.webdriver.common.by import By
+from selenium.webdriver.common.keys import Keys
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import (
+    TimeoutException, WebDriverException, StaleElementReferenceException, ElementClickInterceptedException,
+    ElementNotInteractableException, NoSuchElementException, InvalidSessionIdException, NoSuchWindowException,
+)
+
+
+# ================================================================
+# CONFIG (Prod‑only)
+# ================================================================
+APP_DIR = os.path.dirname(os.path.abspath(__file__))  # caches, journals and logs live next to the scripts
+
+CSOD_BASE_URL = os.environ.get("CSOD_BASE_URL", "https://lkq.csod.com").rstrip("/")  # override only for csod_mock.py
+URL_COURSE_SEARCH = CSOD_BASE_URL + "/LMS/admin/catalog/NewUI/search.aspx"  # Catalog admin search
+URL_USER_ADMIN   = CSOD_BASE_URL + "/admin/Users.aspx?tab_page_id=-38"     # User admin (password reset)
+
+# IDs / XPaths (adjust as CSOD UI updates)
+ID_COURSE_SEARCH_BOX = "ctl00_bodyPlaceHolder_ucCatalogSearchFilters_txtSearch"
+ID_REVIEW_DATE_FIELD = "CustomFieldControl_dtlCustomField_ctl19_customFieldWrapper_ctl00_dateCtrl_textboxDate"
+ID_LANGUAGE_DROPDOWN = "LanguageControl_LangCB_Input"
+ID_LANGUAGE_LIST     = "LanguageControl_LangCB_DropDown"  # RadComboBox popup holding the checkboxes
+ID_COURSE_ACTION_MENU = "ctl00_bodyPlaceHolder_rptTraining_ctl01_actionMenu"
+ID_COURSE_EDIT_BTN    = "ctl00_bodyPlaceHolder_rptTraining_ctl01_btnEdit"
+ID_COURSE_SAVE_BTN    = "SubmitButton"
+ID_COURSE_SEARCH_BTN  = "ctl00_bodyPlaceHolder_ucCatalogSearchFilters_btnSearch"  # HTTP engine only; confirm in prod
+ID_COURSE_VALIDATION_SUMMARY = "ValidationSummary"                               # HTTP engine only; confirm in prod
+
+# Password reset UI selectors (Prod)
+ID_USER_SEARCH_BOX    = "userIdText"  # confirm in prod; change if needed
+ID_USER_SEARCH_BTN    = "searchButton"  # HTTP engine only; confirm in prod
+ID_USER_ROW_OPTIONS   = "rptUsers_ctl00_ddlUserOptions"
+CLASS_USER_OPTIONS_BTN = "CsDropDownBtn"
+ID_PASSWORD_CHANGE_LINK = "rptUsers_ctl00_ddlUserOptions_lnkPasswordChange"
+ID_PASSWD_MANUAL_RADIO  = "passwdReset-manual"
+ID_PASSWD_NEW_BOX       = "newPasswordTextBox"
+ID_PASSWD_CONFIRM_BOX   = "confirmPasswordTextBox"
+ID_PASSWD_SAVE_BTN      = "saveImageButton"
+
+# Behavior
+DEFAULT_TIMEOUT = 15
+WAIT_POLL       = 0.1  # seconds between readiness checks (replaces fixed sleeps)
+LOGIN_TIMEOUT   = 300  # allow 5 min for manual login
+LEGACY_DEBUG_CSV = False  # if True, write password‑including CSVs for debug
+DEBUG = False             # verbose element enumerations
+
+# Headless / scheduled runs (CLI)
+CLI_PROFILE_DIR = os.path.join(APP_DIR, "chrome-profile")  # persisted Chrome profile holding the CSOD login
+
+# Remembered login (GUI, opt-in): the main Chrome uses this profile while the folder exists
+GUI_PROFILE_DIR = os.path.join(APP_DIR, "chrome-profile-gui")
+LOGIN_SETTLE    = 1.5  # seconds a login page must stay before it counts (SSO redirects pass through them)
+
+# Worker pool (extra Chrome sessions cloned from the logged-in one)
+POOL_WORKERS     = 1   # default worker count shown in the UI (1 = single shared driver)
+POOL_MAX_WORKERS = 8   # upper bound offered by the Workers spinbox
+
+# Run pipeline (read -> validate -> execute -> write, connected by bounded queues)
+PIPELINE_QUEUE_SIZE = 64  # items buffered between two stages (back-pressure beyond that)
+
+# Retries (transient errors are re-queued; a lost browser session is restarted)
+RETRY_MAX_ATTEMPTS = 3     # tries per row, first one included
+RETRY_BACKOFF      = 2.0   # seconds before the 2nd try, doubled for every further one
+RETRY_BACKOFF_MAX  = 30.0
+SESSION_FATAL_MARKERS = ("invalid session id", "chrome not reachable", "session deleted", "disconnected",
+                         "no such window", "target window already closed", "tab crashed", "browser has closed")
+
+# Browser recycling (long runs: a fresh Chrome with the same cookies instead of an ever-growing one)
+RECYCLE_AFTER_ROWS   = 400   # rows per driver before it is replaced (0 = never)
+RECYCLE_MAX_RSS_MB   = 1500  # replace a driver whose Chrome process tree uses more (needs psutil; 0 = off)
+RECYCLE_CHECK_EVERY  = 20    # rows between RSS measurements
+
+# HTTP engine (optional; Selenium remains the fallback per row)
+HTTP_ENGINE_ENABLED = False  # default of the "HTTP engine" checkbox
+HTTP_TIMEOUT        = 20     # seconds per request
+HTTP_MAX_REDIRECTS  = 8
+LOGIN_URL_MARKERS   = ("login", "signin", "sso", "saml")  # whole path segments / host label of the login flow
+
+# Log pipeline (UI shows the tail; full log goes to a rotating file)
+LOG_DIR             = os.path.join(APP_DIR, "logs")
+LOG_TICK_MS         = 150        # UI drains buffered log lines at this interval
+LOG_BUFFER_MAX      = 5000       # lines buffered between ticks before the oldest are dropped
+LOG_WIDGET_MAX_LINES = 2000      # lines kept in each log widget
+LOG_FILE_MAX_BYTES  = 5_000_000
+LOG_FILE_BACKUPS    = 5
+
+# Progress panel (polled by the UI; rows/minute over a moving window drives the ETA)
+PROGRESS_REFRESH_MS  = 500   # panel redraw interval; updates in between are merged
+PROGRESS_RATE_WINDOW = 120   # seconds of finished rows behind the rate
+
+# Checkpoint journal (resume after crash / cancel)
+JOURNAL_DIR = os.path.join(APP_DIR, "journals")
+
+# Streamed results (one CSV line per finished row; the download buttons copy / convert it)
+RESULTS_DIR = os.path.join(APP_DIR, "results")
+
+# Step tracing (per-step timings per row; off = no recording)
+TRACE_ENABLED = False  # default of the "Trace steps" checkbox / CLI --trace
+TRACE_DIR     = os.path.join(APP_DIR, "traces")  # <mode>_<timestamp>.csv + .json (chrome://tracing)
+
+# Pre-flight validation (before the browser is touched)
+LANGUAGE_CATALOG_PATH = os.path.join(APP_DIR, "language_catalog.json")  # picker labels seen on the tenant
+DATE_INPUT_FORMATS = ("%m/%d/%Y", "%m/%d/%y", "%Y-%m-%d", "%Y/%m/%d", "%m-%d-%Y", "%d-%b-%Y", "%b %d, %Y", "%B %d, %Y")
+
+# Sharded runs (CLI 'shard': one process + Chrome per shard, results merged into one report)
+SHARD_DIR = os.path.join(APP_DIR, "shards")  # may be a directory shared by several hosts
+
+# User-load feed (bulk password changes through a CSOD data load instead of the UI)
+FEED_DIR          = os.path.join(APP_DIR, "feeds")
+FEED_HEADER       = ("User ID", "Password")  # match the tenant's user-load template
+FEED_DELIMITER    = ","
+FEED_ENCODING     = "utf-8"
+FEED_MAX_ROWS     = 5000         # rows per file (split above the portal's load limit)
+FEED_MAX_BYTES    = 10_000_000   # bytes per file
+FEED_PASSWORD_MIN = 8            # shortest password accepted by the tenant's policy
+
+# Course index cache (skip the search round-trip for courses seen before)
+COURSE_INDEX_ENABLED  = True
+COURSE_INDEX_PATH     = os.path.join(APP_DIR, "course_index.sqlite3")
+COURSE_INDEX_TTL_DAYS = 90  # re-resolve entries older than this
+
+# Run history (every run with its rows and step timings; `python Automate.py history` for trends)
+RUN_HISTORY_ENABLED   = True
+RUN_HISTORY_PATH      = os.path.join(APP_DIR, "run_history.sqlite3")
+HISTORY_BASELINE_RUNS = 5     # earlier comparable runs whose median is the baseline
+HISTORY_BASELINE_MIN  = 3     # fewer comparable runs -> no verdict
+HISTORY_MIN_ROWS      = 20    # smaller runs are neither judged nor part of a baseline
+HISTORY_RATE_DROP     = 0.25  # flag rows/minute per browser this far below the baseline
+HISTORY_LATENCY_RISE  = 0.30  # flag a median row time this far above it
+HISTORY_FAIL_RISE     = 0.10  # flag a failure rate this many points above it
+
+
+# ================================================================
+# Browser Manager (shared Selenium session)
+# ================================================================
+class BrowserManager:
+    # CookieParam fields accepted by CDP Network.setCookies
+    _CDP_COOKIE_KEYS = ("name", "value", "domain", "path", "secure", "httpOnly", "sameSite", "expires")
+
+    def __init__(self, headless: bool = False, profile_dir: Optional[str] = None):
+        self.driver = None
+        self.logged_in = False  # best‑effort flag
+        self.pool_drivers: List[webdriver.Chrome] = []  # extra sessions cloned from self.driver
+        self.headless = headless
+        self.profile_dir = profile_dir  # Chrome user-data-dir of the main driver (None = throwaway profile)
+        self.session_cookies: List[dict] = []  # last login cookies, used to restore restarted drivers
+        self.recovery_failure: Optional[str] = None  # why the last recover_driver() failed: "start" | "login"
+        self._lock = threading.Lock()  # guards the driver list and row counters (never held across Chrome calls)
+        self._rows: Dict[int, int] = {}  # id(driver) -> rows processed since it started
+        self.recycles = 0
+        self.peak_rss_mb = 0.0
+
+    def _new_driver(self, profile_dir: Optional[str] = None) -> webdriver.Chrome:
+        chrome_options = Options()
+        chrome_options.add_argument("--no-sandbox")
+        chrome_options.add_argument("--disable-dev-shm-usage")
+        chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
+        chrome_options.add_experimental_option('useAutomationExtension', False)
+        if self.headless:
+            chrome_options.add_argument("--headless=new")
+            chrome_options.add_argument("--window-size=1920,1080")
+        if profile_dir:
+            chrome_options.add_argument(f"--user-data-dir={profile_dir}")
+        drv = webdriver.Chrome(options=chrome_options)
+        if not self.headless:
+            drv.maximize_window()
+        return drv
+
+    def ensure_driver(self) -> webdriver.Chrome:
+        if self.driver is not None:
+            # try pinging driver to see if still alive
+            try:
+                _ = self.driver.current_url  # will throw if dead
+                return self.driver
+            except Exception:
+                self._quiet_quit()
+        # create new
+        self.driver = self._new_driver(self.profile_dir)
+        self.logged_in = False
+        return self.driver
+
+    # --- Worker pool ---
+    def export_cookies(self, drv=None) -> List[dict]:
+        """All cookies of the session (every domain, incl. SSO), via CDP when available."""
+        drv = drv or self.driver
+        try:
+            return drv.execute_cdp_cmd("Network.getAllCookies", {}).get("cookies", [])
+        except Exception:
+            return drv.get_cookies()
+
+    def import_cookies(self, drv, cookies: List[dict], url: str):
+        """Load cookies captured by export_cookies() into another driver."""
+        params = [{k: c[k] for k in self._CDP_COOKIE_KEYS if k in c} for c in cookies]
+        try:
+            drv.execute_cdp_cmd("Network.enable", {})
+            drv.execute_cdp_cmd("Network.setCookies", {"cookies": params})
+            return
+        except Exception:
+            pass
+        # fallback: WebDriver add_cookie only works for the current domain
+        drv.get(url)
+        host = url.split("/")[2]
+        for c in cookies:
+            if host.endswith(c.get("domain", "").lstrip(".")):
+                try:
+                    drv.add_cookie({k: c[k] for k in ("name", "value", "path", "secure", "httpOnly", "expiry") if k in c})
+                except Exception:
+                    continue
+
+    def _alive(self, drv) -> bool:
+        try:
+            _ = drv.current_url
+            return True
+        except Exception:
+            return False
+
+    def ensure_pool(self, n: int, url: str, expected_locator: Tuple[str,str], log=print) -> List[webdriver.Chrome]:
+        """Return [main driver] + n-1 clones sharing its login, each parked on url.
+
+        Must be called after navigate_and_login() succeeded on the main driver.
+        Clones that fail to start or reach the page are dropped with a log line,
+        so the run continues with fewer workers rather than failing.
+        """
+        for drv in [d for d in self.pool_drivers if not self._alive(d)]:
+            self._quit_one(drv)
+            self.pool_drivers.remove(drv)
+        while len(self.pool_drivers) > n - 1:
+            self._quit_one(self.pool_drivers.pop())
+        cookies = self.session_cookies = self.export_cookies()
+        while len(self.pool_drivers) < n - 1:
+            try:
+                self.pool_drivers.append(self._new_driver())
+            except WebDriverException as e:
+                log(f"⚠️ Could not start worker browser: {e}")
+                break
+        ready = [self.driver]
+        for i, drv in enumerate(self.pool_drivers, 2):
+            try:
+                self.import_cookies(drv, cookies, url)
+                drv.get(url)
+                WebDriverWait(drv, DEFAULT_TIMEOUT).until(EC.presence_of_element_located(expected_locator))
+                ready.append(drv)
+            except Exception as e:
+                log(f"⚠️ Worker {i} could not reuse the login session: {e}")
+        return ready
+
+    def recover_driver(self, dead, url: str, expected_locator: Tuple[str,str], msg: str, log=print,
+                       prompt: Optional[Callable[[str, str], None]] = None,
+                       on_error: Optional[Callable[[str, str], None]] = None) -> Optional[webdriver.Chrome]:
+        """Replace a crashed or logged-out driver (main or pool) by a fresh one parked on url.
+
+        The login is restored from the cookies of a live sibling driver, else from the last
+        snapshot; if that is not accepted, the main driver goes through navigate_and_login()
+        (prompting again where a prompt is available). Returns None when it cannot be restored.
+        """
+        # The lock only covers the driver list swaps: starting Chrome and logging in happen
+        # outside it, so the other workers keep counting rows meanwhile.
+        with self._lock:
+            siblings = [d for d in [self.driver] + self.pool_drivers if d is not None and d is not dead]
+            is_main = dead is self.driver
+            if is_main:
+                self.driver = None
+                self.logged_in = False
+            elif dead in self.pool_drivers:
+                self.pool_drivers.remove(dead)
+        donor = next((d for d in siblings if self._alive(d)), None)
+        if donor is not None:
+            self.session_cookies = self.export_cookies(donor) or self.session_cookies
+        self._quit_one(dead)
+        try:
+            drv = self._new_driver(self.profile_dir if is_main else None)
+        except WebDriverException as e:
+            log(f"⚠️ Could not start a new browser: {e}")
+            self.recovery_failure = "start"
+            return None
+        with self._lock:
+            if is_main:
+                self.driver = drv  # navigate_and_login() below works on self.driver
+            else:
+                self.pool_drivers.append(drv)
+        if self.session_cookies:
+            try:
+                self.import_cookies(drv, self.session_cookies, url)
+                drv.get(url)
+                WebDriverWait(drv, DEFAULT_TIMEOUT).until(EC.presence_of_element_located(expected_locator))
+                self.logged_in = self.logged_in or is_main
+                return drv
+            except Exception as e:
+                log(f"⚠️ Saved session was not accepted: {e}")
+        if is_main and self.navigate_and_login(url, expected_locator, msg, prompt, on_error):
+            self.session_cookies = self.export_cookies(drv)
+            return drv
+        if not is_main:
+            with self._lock:
+                self.pool_drivers.remove(drv)
+            self._quit_one(drv)
+        self.recovery_failure = "login"
+        return None
+
+    # --- Recycling (memory budget) ---
+    def driver_rss_mb(self, drv) -> Optional[float]:
+        """Resident memory of drv's chromedriver + Chrome process tree; None without psutil."""
+        if psutil is None:
+            return None
+        try:
+            proc = psutil.Process(drv.service.process.pid)
+            rss = sum(p.memory_info().rss for p in [proc] + proc.children(recursive=True))
+        except Exception:
+            return None
+        mb = rss / 1_048_576
+        self.peak_rss_mb = max(self.peak_rss_mb, mb)
+        return mb
+
+    def count_row(self, drv) -> Optional[str]:
+        """Count a finished row on drv; returns why it should be recycled now, or None."""
+        with self._lock:
+            n = self._rows[id(drv)] = self._rows.get(id(drv), 0) + 1
+        if RECYCLE_AFTER_ROWS and n >= RECYCLE_AFTER_ROWS:
+            return f"{n} rows"
+        if RECYCLE_MAX_RSS_MB and n % RECYCLE_CHECK_EVERY == 0:
+            mb = self.driver_rss_mb(drv)
+            if mb is not None and mb > RECYCLE_MAX_RSS_MB:
+                return f"{mb:.0f} MB RSS after {n} rows"
+        return None
+
+    def recycle_driver(self, drv, url: str, expected_locator: Tuple[str,str], msg: str, log=print,
+                       prompt=None, on_error=None) -> Optional[webdriver.Chrome]:
+        """Replace a healthy but worn driver by a fresh one, carrying its cookies over (no new login).
+
+        The new driver is started and parked on url before drv is quit; if that fails, drv is
+        kept (and returned) and its row count restarts. Only the main driver on a Chrome profile
+        is quit first (two Chromes cannot share a user-data-dir) and may come back as None.
+        """
+        try:
+            self.session_cookies = self.export_cookies(drv) or self.session_cookies
+        except Exception:
+            pass
+        if drv is self.driver and self.profile_dir:
+            new = self.recover_driver(drv, url, expected_locator, msg, log, prompt, on_error)
+            if new is not None:
+                self.recycles += 1
+            return new
+        new = None
+        try:
+            new = self._new_driver()
+            self.import_cookies(new, self.session_cookies, url)
+            new.get(url)
+            WebDriverWait(new, DEFAULT_TIMEOUT).until(EC.presence_of_element_located(expected_locator))
+        except Exception as e:
+            log(f"⚠️ Could not start a replacement browser, keeping the old one: {e}")
+            if new is not None:
+                self._quit_one(new)
+            with self._lock:
+                self._rows[id(drv)] = 0
+            return drv
+        with self._lock:
+            if drv is self.driver:
+                self.driver = new
+            elif drv in self.pool_drivers:
+                self.pool_drivers[self.pool_drivers.index(drv)] = new
+            self.recycles += 1
+        self._quit_one(drv)
+        return new
+
+    def memory_summary(self) -> List[str]:
+        if not self.recycles and not self.peak_rss_mb:
+            return []
+        peak = f", peak {self.peak_rss_mb:.0f} MB RSS" if self.peak_rss_mb else ""
+        return [f"🧠 Browser: {self.recycles} recycle(s) so far{peak}"]
+
+    def _quit_one(self, drv):
+        with self._lock:
+            self._rows.pop(id(drv), None)
+        try:
+            drv.quit()
+        except Exception:
+            pass
+
+    def _quiet_quit(self):
+        with self._lock:
+            self._rows.pop(id(self.driver), None)
+        try:
+            if self.driver:
+                self.driver.quit()
+        except Exception:
+            pass
+        self.driver = None
+        self.logged_in = False
+
+    def close(self):
+        for drv in self.pool_drivers:
+            self._quit_one(drv)
+        self.pool_drivers = []
+        self._quiet_quit()
+
+    def wait_for_session(self, drv, expected_locator: Tuple[str,str], timeout: float = DEFAULT_TIMEOUT) -> str:
+        """"ready" once expected_locator is present; "login" once a login page (URL marker or a
+        visible password form) has stayed for LOGIN_SETTLE seconds; else "timeout"."""
+        since = []
+        def check(d):
+            if d.find_elements(*expected_locator):
+                return "ready"
+            if _is_login_url(d.current_url) or d.execute_script(_LOGIN_FORM_JS):
+                since[:] = since or [time.monotonic()]
+                if time.monotonic() - since[0] >= LOGIN_SETTLE:
+                    return "login"
+            else:
+                since.clear()
+            return False
+        try:
+            return WebDriverWait(drv, timeout, poll_frequency=WAIT_POLL).until(check)
+        except TimeoutException:
+            return "login" if since else "timeout"
+
+    def navigate_and_login(self, url: str, expected_locator: Tuple[str,str], msg: str,
+                           prompt: Optional[Callable[[str, str], None]] = None,
+                           on_error: Optional[Callable[[str, str], None]] = None) -> bool:
+        """Navigate to URL, prompt user to log in if needed, wait for expected element.
+
+        A valid session (e.g. from a persisted profile) goes straight through; a login
+        page is recognised as soon as it shows. prompt(title, text) then asks the user to
+        log in and returns once they confirm. Without a prompt (headless runs) nobody can
+        log in, so False is returned. on_error(title, text) reports why.
+        """
+        on_error = on_error or (lambda title, text: None)
+        drv = self.ensure_driver()
+        try:
+            drv.get(url)
+        except WebDriverException as e:
+            on_error("Navigation Error", f"Could not open {url}: {e}")
+            return False
+        state = self.wait_for_session(drv, expected_locator)
+        if state == "ready":
+            self.logged_in = True
+            return True
+        self.logged_in = False
+        if prompt is None:
+            on_error("Login Required", "No valid CSOD session in the browser profile (run the 'login' command first)."
+                     if state == "login" else f"{url} did not show the expected page in time.")
+            return False
+        prompt("Login Required", msg)
+        try:
+            WebDriverWait(drv, LOGIN_TIMEOUT).until(EC.presence_of_element_located(expected_locator))
+        except TimeoutException:
+            on_error("Login Timeout", "Timed out waiting for required page element after login.")
+            return False
+        self.logged_in = True
+        return True
+
+
+# ================================================================
+# Course index cache (CourseName -> edit page, persisted in SQLite)
+# ================================================================
+class CourseIndex:
+    """On-disk map of course name to its resolved LO id and edit URL.
+
+    Entries older than COURSE_INDEX_TTL_DAYS are evicted on lookup; an entry whose
+    page no longer matches (renamed/deleted course) is invalidated by the caller.
+    Safe to share between worker threads.
+    """
+    def __init__(self, path: str, ttl_days: float):
+        self.path = path
+        self.ttl = ttl_days * 86400
+        self._lock = threading.Lock()
+        self._conn = None
+        self.hits = self.misses = self.stale = 0
+
+    def _db(self):
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS courses ("
+                " name_key TEXT PRIMARY KEY, course_name TEXT, lo_id TEXT, edit_url TEXT, updated REAL)")
+        return self._conn
+
+    @staticmethod
+    def _key(course_name: str) -> str:
+        return course_name.strip().casefold()
+
+    def lookup(self, course_name: str) -> Optional[str]:
+        with self._lock:
+            db = self._db()
+            row = db.execute("SELECT edit_url, updated FROM courses WHERE name_key=?", (self._key(course_name),)).fetchone()
+            if row and time.time() - row[1] > self.ttl:
+                db.execute("DELETE FROM courses WHERE name_key=?", (self._key(course_name),)); db.commit()
+                self.stale += 1
+                row = None
+            if row:
+                self.hits += 1
+                return row[0]
+            self.misses += 1
+            return None
+
+    def store(self, course_name: str, edit_url: str):
+        with self._lock:
+            db = self._db()
+            db.execute("INSERT OR REPLACE INTO courses VALUES (?,?,?,?,?)",
+                       (self._key(course_name), course_name, _lo_id_from_url(edit_url), edit_url, time.time()))
+            db.commit()
+
+    def invalidate(self, course_name: str):
+        with self._lock:
+            self.hits -= 1; self.misses += 1; self.stale += 1
+            db = self._db()
+            db.execute("DELETE FROM courses WHERE name_key=?", (self._key(course_name),)); db.commit()
+
+    def clear(self):
+        with self._lock:
+            db = self._db()
+            db.execute("DELETE FROM courses"); db.commit()
+
+    def reset_counters(self):
+        with self._lock:
+            self.hits = self.misses = self.stale = 0
+
+    def summary(self) -> List[str]:
+        if not (self.hits or self.misses):
+            return []
+        return [f"🗂️ Course index: {self.hits} hit(s), {self.misses} miss(es), {self.stale} stale entr(ies) evicted"]
+
+
+def _lo_id_from_url(url: str) -> str:
+    """Best-effort LO identifier from an edit URL's query string (loid=/lo=/objectid=/id=)."""
+    params = {k.lower(): v for k, v in urllib.parse.parse_qsl(urllib.parse.urlsplit(url).query)}
+    for k in ("loid", "lo", "objectid", "id"):
+        if params.get(k):
+            return params[k]
+    return ""
+
+
+COURSE_INDEX = CourseIndex(COURSE_INDEX_PATH, COURSE_INDEX_TTL_DAYS) if COURSE_INDEX_ENABLED else None
+
+
+# ================================================================
+# HTTP engine (browserless postbacks re-using the Selenium login)
+# ================================================================
+class HttpEngineError(Exception):
+    """The HTTP engine cannot handle this row; the caller falls back to Selenium.
+
+    Only raised *before* anything was saved, so the fallback never double-submits.
+    """
+
+
+class _AspNetFormParser(HTMLParser):
+    """Collects the (single) WebForms <form>: action, successful field values and elements by id."""
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.action = ""
+        self.fields: Dict[str, str] = {}
+        self.elements: Dict[str, dict] = {}
+        self._select = None; self._select_first = None
+        self._textarea = None
+
+    def handle_starttag(self, tag, attrs):
+        a = {k: (v if v is not None else "") for k, v in attrs}
+        if a.get("id"):
+            self.elements[a["id"]] = dict(a, tag=tag)
+        name = a.get("name")
+        if tag == "form" and not self.action:
+            self.action = a.get("action", "")
+        elif tag == "input" and name:
+            kind = a.get("type", "text").lower()
+            if kind in ("checkbox", "radio"):
+                if "checked" in a:
+                    self.fields[name] = a.get("value", "on")
+            elif kind not in ("submit", "image", "button", "reset", "file"):
+                self.fields[name] = a.get("value", "")
+        elif tag == "select" and name:
+            self._select, self._select_first = name, None
+        elif tag == "option" and self._select:
+            value = a.get("value", "")
+            if self._select_first is None:
+                self._select_first = value
+            if "selected" in a:
+                self.fields[self._select] = value
+        elif tag == "textarea" and name:
+            self._textarea = name
+            self.fields[name] = ""
+
+    def handle_endtag(self, tag):
+        if tag == "select" and self._select:
+            if self._select not in self.fields and self._select_first is not None:
+                self.fields[self._select] = self._select_first
+            self._select = None
+        elif tag == "textarea":
+            self._textarea = None
+
+    def handle_data(self, data):
+        if self._textarea:
+            self.fields[self._textarea] += data
+
+
+class AspNetForm:
+    """Parsed WebForms page: fill fields by element id and build postback bodies."""
+    _DO_POSTBACK = re.compile(r"""__doPostBack\(\s*['"]([^'"]*)['"]\s*,\s*['"]([^'"]*)['"]""")
+    _POSTBACK_OPTIONS = re.compile(r"""WebForm_PostBackOptions\(\s*["']([^"']+)["']""")
+
+    def __init__(self, url: str, html: str):
+        p = _AspNetFormParser()
+        p.feed(html)
+        self.url = url
+        self.html = html
+        self.action = urllib.parse.urljoin(url, p.action) if p.action else url
+        self.fields = p.fields
+        self.elements = p.elements
+        if "__VIEWSTATE" not in self.fields:
+            raise HttpEngineError(f"No ASP.NET form (__VIEWSTATE) on {url}")
+
+    def has(self, element_id: str) -> bool:
+        return element_id in self.elements
+
+    def contains_text(self, text: str) -> bool:
+        return text.strip().lower() in html_lib.unescape(self.html).lower()
+
+    def name_of(self, element_id: str) -> str:
+        el = self.elements.get(element_id)
+        if not el or not el.get("name"):
+            raise HttpEngineError(f"Form field '{element_id}' not found")
+        return el["name"]
+
+    def set(self, element_id: str, value: str):
+        self.fields[self.name_of(element_id)] = value
+
+    def check(self, element_id: str):
+        el = self.elements.get(element_id) or {}
+        self.fields[self.name_of(element_id)] = el.get("value", "on")
+
+    def postback_target(self, element_id: str) -> Optional[str]:
+        """__EVENTTARGET of a LinkButton-style element, None if it is a plain link/submit."""
+        href = html_lib.unescape((self.elements.get(element_id) or {}).get("href", ""))
+        m = self._DO_POSTBACK.search(href) or self._POSTBACK_OPTIONS.search(href)
+        return m.group(1) if m else None
+
+    def href(self, element_id: str) -> Optional[str]:
+        href = (self.elements.get(element_id) or {}).get("href", "")
+        if not href or href.lower().startswith("javascript:"):
+            return None
+        return urllib.parse.urljoin(self.url, html_lib.unescape(href))
+
+    def click_body(self, element_id: str) -> Dict[str, str]:
+        """Form body that submits the page as if element_id were clicked."""
+        el = self.elements.get(element_id)
+        if not el:
+            raise HttpEngineError(f"Button '{element_id}' not found")
+        body = dict(self.fields, __EVENTTARGET="", __EVENTARGUMENT="")
+        target = self.postback_target(element_id)
+        kind = el.get("type", "").lower()
+        if target:
+            body["__EVENTTARGET"] = target
+        elif el["tag"] == "input" and kind == "image":
+            body[el["name"] + ".x"] = "1"; body[el["name"] + ".y"] = "1"
+        elif el.get("name"):
+            body[el["name"]] = el.get("value", "")
+        else:
+            raise HttpEngineError(f"Don't know how to click '{element_id}'")
+        return body
+
+
+class HttpSession:
+    """Minimal cookie-aware HTTP client with one keep-alive connection per host and thread."""
+    def __init__(self, cookies: List[dict], user_agent: str = "", timeout: float = HTTP_TIMEOUT):
+        self.timeout = timeout
+        self.user_agent = user_agent or "Mozilla/5.0"
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        # (domain, path, name) -> (value, secure)
+        self.jar = {(c.get("domain", "").lstrip("."), c.get("path", "/") or "/", c["name"]): (c.get("value", ""), bool(c.get("secure")))
+                    for c in cookies if c.get("name")}
+
+    def _cookie_header(self, host: str, path: str, secure: bool) -> str:
+        with self._lock:
+            return "; ".join(f"{name}={value}" for (domain, cpath, name), (value, csecure) in self.jar.items()
+                             if (host == domain or host.endswith("." + domain)) and path.startswith(cpath)
+                             and (secure or not csecure))
+
+    def _store_cookies(self, host: str, headers):
+        for raw in headers.get_all("Set-Cookie") or []:
+            jar = SimpleCookie()
+            try:
+                jar.load(raw)
+            except Exception:
+                continue
+            with self._lock:
+                for name, morsel in jar.items():
+                    key = ((morsel["domain"] or host).lstrip("."), morsel["path"] or "/", name)
+                    if morsel["max-age"] == "0":
+                        self.jar.pop(key, None)
+                    else:
+                        self.jar[key] = (morsel.value, bool(morsel["secure"]))
+
+    def _connection(self, scheme: str, netloc: str, fresh: bool = False):
+        pool = getattr(self._local, "pool", None)
+        if pool is None:
+            pool = self._local.pool = {}
+        conn = pool.get((scheme, netloc))
+        if conn is None or fresh:
+            if conn is not None:
+                conn.close()
+            cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+            conn = pool[(scheme, netloc)] = cls(netloc, timeout=self.timeout)
+        return conn
+
+    def _send(self, method: str, url: str, body: Optional[bytes]):
+        parts = urllib.parse.urlsplit(url)
+        path = parts.path or "/"
+        headers = {"User-Agent": self.user_agent, "Accept-Encoding": "gzip", "Connection": "keep-alive",
+                   "Cookie": self._cookie_header(parts.hostname or "", path, parts.scheme == "https")}
+        if body is not None:
+            headers["Content-Type"] = "application/x-www-form-urlencoded"
+        target = path + ("?" + parts.query if parts.query else "")
+        for attempt in (0, 1):  # retry once if the server closed the kept-alive socket
+            conn = self._connection(parts.scheme, parts.netloc, fresh=attempt > 0)
+            try:
+                conn.request(method, target, body=body, headers=headers)
+                resp = conn.getresponse()
+                data = resp.read()
+                break
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                if attempt:
+                    raise
+        self._store_cookies(parts.hostname or "", resp.headers)
+        if resp.getheader("Content-Encoding", "").lower() == "gzip":
+            data = gzip.decompress(data)
+        return resp.status, resp.getheader("Location"), data.decode(resp.headers.get_content_charset() or "utf-8", "replace")
+
+    def request(self, method: str, url: str, fields: Optional[Dict[str, str]] = None) -> Tuple[str, str]:
+        """Perform the request, following redirects. Returns (final_url, html)."""
+        body = urllib.parse.urlencode(fields).encode() if fields is not None else None
+        for _ in range(HTTP_MAX_REDIRECTS):
+            status, location, html = self._send(method, url, body)
+            if status in (301, 302, 303, 307, 308) and location:
+                url = urllib.parse.urljoin(url, location)
+                if status in (301, 302, 303):
+                    method, body = "GET", None
+                continue
+            if _is_login_url(url):
+                raise HttpEngineError("Session expired (redirected to login)")
+            if status >= 400:
+                raise HttpEngineError(f"HTTP {status} for {url}")
+            return url, html
+        raise HttpEngineError(f"Too many redirects for {url}")
+
+    def get_form(self, url: str) -> AspNetForm:
+        return AspNetForm(*self.request("GET", url))
+
+    def post_form(self, form: AspNetForm, body: Dict[str, str]) -> AspNetForm:
+        final_url, html = self.request("POST", form.action, body)
+        try:
+            return AspNetForm(final_url, html)
+        except HttpEngineError:
+            return _PlainPage(final_url, html)
+
+
+class _PlainPage(AspNetForm):
+    """Response page without a WebForms form (e.g. a confirmation page)."""
+    def __init__(self, url: str, html: str):
+        self.url = url; self.html = html; self.action = url
+        self.fields = {}; self.elements = {}
+
+
+def _is_login_url(url: str) -> bool:
+    """A path segment (extension dropped) or the host's first label is a login marker:
+    /login/render.aspx and sso.example.com match, /lessons/... does not."""
+    parts = urllib.parse.urlsplit(url.lower())
+    words = {seg.split(".")[0] for seg in parts.path.split("/") if seg}
+    words.add((parts.hostname or "").split(".")[0])
+    return not words.isdisjoint(LOGIN_URL_MARKERS)
+
+
+# Login form on screen: a visible password box next to a visible text / email box.
+_LOGIN_FORM_JS = """
+var vis = function (e) { return !!(e.offsetWidth || e.offsetHeight || e.getClientRects().length); };
+var pwd = Array.prototype.filter.call(document.querySelectorAll('input[type=password]'), vis);
+return pwd.length > 0 && Array.prototype.some.call(
+  document.querySelectorAll('input[type=text], input[type=email], input:not([type])'), vis);
+"""
+
+
+class SessionExpired(RuntimeError):
+    """The browser was sent to the login page in the middle of a run."""
+
+
+def _check_session(drv):
+    """Raise SessionExpired right away when drv landed on the login flow (instead of timing out)."""
+    if _is_login_url(drv.current_url):
+        raise SessionExpired(f"Redirected to the login page ({drv.current_url.split('?')[0]})")
+
+
+_PWD_ERROR_PATTERNS = [
+    re.compile(r"cannot be the same as the previous[^<]*", re.I),
+    re.compile(r"<span[^>]*class=\"[^\"]*error[^\"]*\"[^>]*>([^<]*password[^<]*)<", re.I),
+]
+# Same notices as _PWD_SUCCESS_XPATHS; a response without one (or without the closed dialog) is unconfirmed.
+_PWD_SUCCESS_PATTERNS = [
+    re.compile(r"class=\"[^\"]*success[^\"]*\"[^>]*>[^<]*Password"),
+    re.compile(r">\s*Password (?:updated|changed)"),
+]
+
+
+class HttpEngine:
+    """Runs course-edit and password-reset postbacks over HTTP with the browser's cookies."""
+    def __init__(self, session: HttpSession, search_url: str = URL_COURSE_SEARCH, user_admin_url: str = URL_USER_ADMIN,
+                 index: Optional[CourseIndex] = None):
+        self.session = session
+        self.search_url = search_url
+        self.user_admin_url = user_admin_url
+        self.index = index if index is not None else COURSE_INDEX
+
+    @classmethod
+    def from_driver(cls, drv, browser: BrowserManager, **kw) -> "HttpEngine":
+        ua = ""
+        try:
+            ua = drv.execute_script("return navigator.userAgent;") or ""
+        except WebDriverException:
+            pass
+        return cls(HttpSession(browser.export_cookies(drv), ua), **kw)
+
+    # --- Courses ---
+    def _course_edit_form(self, course_name: str) -> AspNetForm:
+        cached = self.index.lookup(course_name) if self.index else None
+        if cached:
+            form = self.session.get_form(cached)
+            if form.has(ID_COURSE_SAVE_BTN) and form.contains_text(course_name):
+                return form
+            self.index.invalidate(course_name)
+        search = self.session.get_form(self.search_url)
+        search.set(ID_COURSE_SEARCH_BOX, course_name)
+        results = self.session.post_form(search, search.click_body(ID_COURSE_SEARCH_BTN))
+        if not results.has(ID_COURSE_EDIT_BTN):
+            raise HttpEngineError(f"Course '{course_name}' not found in search results")
+        url = results.href(ID_COURSE_EDIT_BTN)
+        form = self.session.get_form(url) if url else self.session.post_form(results, results.click_body(ID_COURSE_EDIT_BTN))
+        if not form.has(ID_COURSE_SAVE_BTN):
+            raise HttpEngineError("Edit page did not load")
+        if self.index:
+            self.index.store(course_name, form.url)
+        return form
+
+    def update_course(self, course_name: str, date_str: Optional[str] = None, langs: Optional[List[str]] = None,
+                      dry_run: bool = False) -> Tuple[str, str]:
+        """(ROW_* status, message); the save is skipped when the form already holds date_str."""
+        if langs:
+            raise HttpEngineError("Language picker is client-side only")
+        form = self._course_edit_form(course_name)
+        current = form.fields.get(form.name_of(ID_REVIEW_DATE_FIELD), "").strip()
+        if not date_str or _same_date(current, date_str):
+            return ROW_SKIPPED, "No change"
+        note = f"review date {current or '(empty)'} → {date_str}"
+        if dry_run:
+            return ROW_PLANNED, note
+        form.set(ID_REVIEW_DATE_FIELD, date_str)
+        page = self.session.post_form(form, form.click_body(ID_COURSE_SAVE_BTN))
+        if page.has(ID_COURSE_SAVE_BTN) and page.has(ID_COURSE_VALIDATION_SUMMARY):
+            return ROW_FAILED, "Save rejected by CSOD validation"
+        return ROW_SUCCESS, note
+
+    # --- Users ---
+    def reset_password(self, user: str, pwd: str, dry_run: bool = False) -> Tuple[str, str]:
+        search = self.session.get_form(self.user_admin_url)
+        search.set(ID_USER_SEARCH_BOX, user)
+        results = self.session.post_form(search, search.click_body(ID_USER_SEARCH_BTN))
+        if not results.has(ID_USER_ROW_OPTIONS):
+            return ROW_FAILED, f"User '{user}' not found"
+        if dry_run:
+            return ROW_PLANNED, "Password would be reset"
+        if results.has(ID_PASSWD_NEW_BOX):
+            dialog = results
+        elif results.postback_target(ID_PASSWORD_CHANGE_LINK):
+            dialog = self.session.post_form(results, results.click_body(ID_PASSWORD_CHANGE_LINK))
+        else:
+            raise HttpEngineError("Password dialog is client-side only")
+        if not dialog.has(ID_PASSWD_NEW_BOX):
+            raise HttpEngineError("Password fields did not load")
+        if dialog.has(ID_PASSWD_MANUAL_RADIO):
+            dialog.check(ID_PASSWD_MANUAL_RADIO)
+        dialog.set(ID_PASSWD_NEW_BOX, pwd)
+        dialog.set(ID_PASSWD_CONFIRM_BOX, pwd)
+        page = self.session.post_form(dialog, dialog.click_body(ID_PASSWD_SAVE_BTN))
+        for pat in _PWD_ERROR_PATTERNS:
+            m = pat.search(page.html)
+            if m:
+                return ROW_FAILED, html_lib.unescape(m.group(m.lastindex or 0)).strip()
+        if not page.has(ID_PASSWD_NEW_BOX) or any(pat.search(page.html) for pat in _PWD_SUCCESS_PATTERNS):
+            return ROW_SUCCESS, "Password reset confirmed (HTTP)"
+        return ROW_SUCCESS, "No confirmation detected (assumed success)"
+
+
+# ================================================================
+# Checkpoint journal (crash-safe resume)
+# ================================================================
+def file_hash(path: str) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+# Row outcomes (also the journal's "status" values). Skipped = already as requested, nothing
+# saved; planned = dry run found a change it would have saved.
+ROW_SUCCESS, ROW_FAILED, ROW_SKIPPED, ROW_PLANNED = "success", "failed", "skipped", "planned"
+
+
+class RunJournal:
+    """Append-only, fsync'd JSON-lines record of finished rows for one mode + workbook.
+
+    Keyed by the workbook's SHA-256, so an edited workbook starts a fresh journal.
+    One line per finished row: {"row": n, "key": ..., "status": ROW_*, "msg": ..., "ts": ...}.
+    Passwords are never written.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._fh = None
+
+    @classmethod
+    def for_workbook(cls, mode: str, excel_path: str) -> "RunJournal":
+        os.makedirs(JOURNAL_DIR, exist_ok=True)
+        return cls(os.path.join(JOURNAL_DIR, f"{mode}_{file_hash(excel_path)[:16]}.jsonl"))
+
+    def completed(self) -> Dict[int, dict]:
+        """Latest record per row index, for rows that succeeded or needed no change."""
+        latest: Dict[int, dict] = {}
+        if not os.path.exists(self.path):
+            return {}
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    rec = json.loads(line)
+                except ValueError:
+                    continue  # torn last line after a crash
+                latest[rec["row"]] = rec
+        return {row: rec for row, rec in latest.items() if rec.get("status") in (ROW_SUCCESS, ROW_SKIPPED)}
+
+    def append(self, row: int, key: str, status: str, msg: str):
+        rec = {"row": row, "key": key, "status": status, "msg": msg, "ts": time.time()}
+        with self._lock:
+            if self._fh is None:
+                torn = False
+                if os.path.exists(self.path) and os.path.getsize(self.path):
+                    with open(self.path, "rb") as f:
+                        f.seek(-1, os.SEEK_END)
+                        torn = f.read(1) != b"\n"
+                self._fh = open(self.path, "a", encoding="utf-8")
+                if torn:
+                    self._fh.write("\n")  # terminate a line cut short by a crash
+            self._fh.write(json.dumps(rec, ensure_ascii=False) + "\n")
+            self._fh.flush()
+            os.fsync(self._fh.fileno())
+
+    def close(self, finished: bool = False):
+        """Close the file; a finished run's journal is archived so the next Start begins fresh."""
+        with self._lock:
+            if self._fh is not None:
+                self._fh.close()
+                self._fh = None
+            if finished and os.path.exists(self.path):
+                os.replace(self.path, self.path[:-len(".jsonl")] + f".done_{time.strftime('%Y%m%d_%H%M%S')}.jsonl")
+
+    def discard(self):
+        self.close(finished=True)
+
+
+# ================================================================
+# Run history (per-run throughput, per-row outcomes and step timings in SQLite)
+# ================================================================
+class RunHistory:
+    """Local record of finished runs, for spotting CSOD releases that slow the batches down.
+
+    runs: one line per run (mode, workbook hash, counts, rows/minute, row time p50/p95);
+    run_rows: status, error and seconds of every row done in the browser;
+    run_steps: per-step n / p50 / p95 / max / total when the run was traced.
+    regressions() compares a run with the median of the comparable runs before it
+    (same mode, engine and dry-run setting). Passwords are never stored. Thread-safe.
+    """
+    _SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS runs (id INTEGER PRIMARY KEY AUTOINCREMENT, mode TEXT, started REAL,"
+        " secs REAL, workbook TEXT, workbook_hash TEXT, host TEXT, browsers INTEGER, http INTEGER,"
+        " dry_run INTEGER, cancelled INTEGER, processed INTEGER, success INTEGER, failed INTEGER,"
+        " skipped INTEGER, planned INTEGER, resumed INTEGER, rejected INTEGER, rate_per_min REAL,"
+        " p50_secs REAL, p95_secs REAL)",
+        "CREATE TABLE IF NOT EXISTS run_rows (run_id INTEGER, row INTEGER, key TEXT, status TEXT, error TEXT, secs REAL)",
+        "CREATE TABLE IF NOT EXISTS run_steps (run_id INTEGER, step TEXT, n INTEGER, p50 REAL, p95 REAL, max REAL, total REAL)",
+        "CREATE INDEX IF NOT EXISTS runs_mode ON runs (mode, started)",
+        "CREATE INDEX IF NOT EXISTS run_rows_run ON run_rows (run_id)",
+    )
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _db(self):
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.row_factory = sqlite3.Row
+            for sql in self._SCHEMA:
+                self._conn.execute(sql)
+        return self._conn
+
+    def record(self, run: dict, rows: List[tuple], steps: List[tuple]) -> int:
+        """Store run (runs columns), rows [(row, key, status, error, secs)] and
+        steps [(step, n, p50, p95, max, total)]; returns the run id."""
+        with self._lock:
+            db = self._db()
+            with db:
+                cur = db.execute(f"INSERT INTO runs ({', '.join(run)}) VALUES ({', '.join('?' * len(run))})",
+                                 tuple(run.values()))
+                run_id = cur.lastrowid
+                db.executemany("INSERT INTO run_rows VALUES (?,?,?,?,?,?)", [(run_id, *r) for r in rows])
+                db.executemany("INSERT INTO run_steps VALUES (?,?,?,?,?,?,?)", [(run_id, *s) for s in steps])
+            return run_id
+
+    def runs(self, mode: Optional[str] = None, limit: int = 20) -> List[dict]:
+        """Newest first."""
+        with self._lock:
+            sql = "SELECT * FROM runs" + (" WHERE mode=?" if mode else "") + " ORDER BY id DESC LIMIT ?"
+            return [dict(r) for r in self._db().execute(sql, ((mode,) if mode else ()) + (limit,))]
+
+    def run(self, run_id: int) -> Optional[dict]:
+        with self._lock:
+            row = self._db().execute("SELECT * FROM runs WHERE id=?", (run_id,)).fetchone()
+            return dict(row) if row else None
+
+    def steps(self, run_id: int) -> List[dict]:
+        with self._lock:
+            return [dict(r) for r in self._db().execute(
+                "SELECT step, n, p50, p95, max, total FROM run_steps WHERE run_id=? ORDER BY total DESC", (run_id,))]
+
+    def top_errors(self, run_id: int, limit: int = 10) -> List[dict]:
+        with self._lock:
+            return [dict(r) for r in self._db().execute(
+                "SELECT error, COUNT(*) AS rows FROM run_rows WHERE run_id=? AND status=? GROUP BY error"
+                " ORDER BY rows DESC LIMIT ?", (run_id, ROW_FAILED, limit))]
+
+    @staticmethod
+    def _metrics(run: dict) -> dict:
+        return {"rate": run["rate_per_min"] / max(run["browsers"], 1), "p50": run["p50_secs"],
+                "fail": run["failed"] / max(run["processed"], 1)}
+
+    def baseline(self, run: dict) -> Optional[dict]:
+        """Median rows/minute per browser, row time p50 and failure rate of the comparable runs
+        before run; None with fewer than HISTORY_BASELINE_MIN of them."""
+        with self._lock:
+            earlier = [dict(r) for r in self._db().execute(
+                "SELECT * FROM runs WHERE mode=? AND http=? AND dry_run=? AND id<? AND processed>=?"
+                " ORDER BY id DESC LIMIT ?",
+                (run["mode"], run["http"], run["dry_run"], run["id"], HISTORY_MIN_ROWS, HISTORY_BASELINE_RUNS))]
+        if len(earlier) < HISTORY_BASELINE_MIN:
+            return None
+        metrics = [self._metrics(r) for r in earlier]
+        return dict({k: _percentile([m[k] for m in metrics], 50) for k in ("rate", "p50", "fail")}, runs=len(earlier))
+
+    def regressions(self, run_id: int) -> List[str]:
+        """Why run_id looks worse than its baseline (empty when it does not, or cannot be judged)."""
+        run = self.run(run_id)
+        if not run or run["processed"] < HISTORY_MIN_ROWS:
+            return []
+        base = self.baseline(run)
+        if not base:
+            return []
+        m, flags = self._metrics(run), []
+        if base["rate"] and m["rate"] < base["rate"] * (1 - HISTORY_RATE_DROP):
+            flags.append(f"throughput {m['rate']:.1f} rows/min per browser vs {base['rate']:.1f} "
+                         f"({m['rate'] / base['rate'] - 1:+.0%})")
+        if base["p50"] and m["p50"] > base["p50"] * (1 + HISTORY_LATENCY_RISE):
+            flags.append(f"median row time {m['p50']:.2f}s vs {base['p50']:.2f}s ({m['p50'] / base['p50'] - 1:+.0%})")
+        if m["fail"] > base["fail"] + HISTORY_FAIL_RISE:
+            flags.append(f"failure rate {m['fail']:.0%} vs {base['fail']:.0%}")
+        return [f"{f} (baseline: median of the last {base['runs']} runs)" for f in flags]
+
+
+RUN_HISTORY = RunHistory(RUN_HISTORY_PATH) if RUN_HISTORY_ENABLED else None
+
+
+# ================================================================
+# Workbook ingestion (streaming, header-mapped, shared by all modes)
+# ================================================================
+def _format_review_date(value) -> str:
+    """Excel date cell -> MM/DD/YYYY; text is passed through trimmed."""
+    if hasattr(value, 'strftime'):
+        return value.strftime('%m/%d/%Y')
+    return str(value).strip()
+
+
+def _normalize_header(value) -> str:
+    """'Course Name' / 'course_name' / 'CourseName' -> 'coursename'"""
+    return "".join(ch for ch in str(value or "").lower() if ch.isalnum())
+
+
+def _split_languages(raw) -> List[str]:
+    """'English, Spanish' -> ['English', 'Spanish']"""
+    return [l.strip() for l in str(raw).split(',') if l and l.strip()]
+
+
+def _clean_text(value) -> str:
+    """Cell -> trimmed text; whole-number floats (Excel's default for IDs) lose their '.0'."""
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip()
+
+
+class Column(NamedTuple):
+    field: str
+    headers: Tuple[str, ...]   # accepted header names (compared after _normalize_header)
+    convert: Callable
+    required: bool = True
+    position: Optional[int] = None  # column used when no header matches (legacy positional sheets)
+
+
+REVIEW_COLUMNS = (
+    Column("course", ("coursename", "course", "title"), _clean_text, position=0),
+    Column("date", ("reviewdate", "date"), _format_review_date, position=1),
+)
+LANGUAGE_COLUMNS = (
+    Column("course", ("coursename", "course", "title"), _clean_text, position=0),
+    Column("languages", ("languages", "language", "availablelanguages"), _split_languages, position=1),
+)
+COURSE_UPDATE_COLUMNS = (
+    Column("course", ("coursename", "course", "title"), _clean_text),
+    Column("date", ("reviewdate",), _format_review_date, required=False),
+    Column("languages", ("languages", "availablelanguages"), _split_languages, required=False),
+)
+PASSWORD_COLUMNS = (
+    Column("user", ("username", "user", "userid"), _clean_text, position=0),
+    Column("password", ("newpassword", "password"), _clean_text, position=1),
+)
+
+
+class WorkbookRows:
+    """Lazily parsed data rows of the active sheet (openpyxl read-only streaming).
+
+    Iterating yields one tuple per valid row, in `columns` order, converted by each
+    Column.convert; optional blank cells become None. Columns are located by header
+    name and fall back to Column.position. `total` is the sheet's row dimension
+    (data rows), known before any row is parsed, for progress reporting.
+    Rows with a missing required value, or with none of `require_any`, are logged and skipped.
+    """
+    def __init__(self, path: str, columns: Tuple[Column, ...], log=print, require_any: Tuple[str, ...] = ()):
+        self.columns = columns
+        self.log = log
+        self.require_any = require_any
+        self._wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
+        ws = self._wb.active
+        self.total = max((ws.max_row or 1) - 1, 0)
+        self._rows = ws.iter_rows(values_only=True)
+        header = [_normalize_header(h) for h in (next(self._rows, None) or ())]
+        self._index = []
+        for col in columns:
+            idx = next((header.index(h) for h in col.headers if h in header), col.position)
+            if idx is None and col.required:
+                self._wb.close()
+                raise ValueError(f"no '{col.headers[0]}' column in header row")
+            self._index.append(idx)
+        if require_any and all(self._index[self._field_pos(f)] is None for f in require_any):
+            self._wb.close()
+            raise ValueError("need at least one of these columns: " + ", ".join(require_any))
+
+    def _field_pos(self, field: str) -> int:
+        return [c.field for c in self.columns].index(field)
+
+    def __iter__(self) -> Iterator[tuple]:
+        try:
+            for raw in self._rows:
+                if not raw or all(v is None or str(v).strip() == "" for v in raw):
+                    continue
+                out = []
+                for col, idx in zip(self.columns, self._index):
+                    value = raw[idx] if idx is not None and idx < len(raw) else None
+                    if value is None or str(value).strip() == "":
+                        out.append(None)
+                    else:
+                        out.append(col.convert(value))
+                if any(v is None for c, v in zip(self.columns, out) if c.required) or \
+                        (self.require_any and all(out[self._field_pos(f)] is None for f in self.require_any)):
+                    self.log(f"⚠️ Skipping row: {raw}")
+                    continue
+                yield tuple(out)
+        finally:
+            self._wb.close()
+
+
+# ================================================================
+# Pre-flight validation (normalise, check and de-duplicate rows before login)
+# ================================================================
+def _normalize_date(text: str) -> Optional[str]:
+    """Any of DATE_INPUT_FORMATS -> MM/DD/YYYY; None if it is not a real date."""
+    for fmt in DATE_INPUT_FORMATS:
+        try:
+            return datetime.datetime.strptime(text.strip(), fmt).strftime("%m/%d/%Y")
+        except ValueError:
+            continue
+    return None
+
+
+class LanguageCatalog:
+    """Language names offered by the tenant's picker, cached in a JSON file.
+
+    Filled from the picker whenever a course's languages are applied; empty until then,
+    in which case languages are not checked up front.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self.names: List[str] = []
+        try:
+            with open(path, encoding="utf-8") as f:
+                self.names = list(json.load(f).get("names", []))
+        except (OSError, ValueError):
+            pass
+
+    def update(self, names: List[str]):
+        names = sorted({n.strip() for n in names if n and n.strip()})
+        with self._lock:
+            if not names or names == self.names:
+                return
+            self.names = names
+            try:
+                tmp = self.path + ".tmp"
+                with open(tmp, "w", encoding="utf-8") as f:
+                    json.dump({"updated": time.time(), "names": names}, f, ensure_ascii=False, indent=1)
+                os.replace(tmp, self.path)
+            except OSError:
+                pass
+
+    def resolve(self, name: str) -> Optional[str]:
+        """Catalog label for name (same rule as the picker script: exact, then contains); None if unknown."""
+        want = name.strip().lower()
+        with self._lock:
+            names = self.names
+        return (next((n for n in names if n.lower() == want), None)
+                or next((n for n in names if want in n.lower()), None))
+
+
+LANGUAGE_CATALOG = LanguageCatalog(LANGUAGE_CATALOG_PATH)
+
+
+class PreflightReport(NamedTuple):
+    rows: List[Tuple[int, tuple]]      # (row index, row) that go to the browser, in sheet order
+    rejected: List[Tuple[str, str]]    # (key, reason) of rows that cannot succeed
+    read: int
+    duplicates: int
+    dropped_languages: int
+
+
+class RowValidator:
+    """Per-row part of the pre-flight check, shared by preflight_rows() and the run pipeline.
+
+    check() normalises dates to MM/DD/YYYY (unparseable -> problem) and maps languages to
+    the catalog's labels (unknown ones dropped with a warning); a row left with nothing
+    to do gets a problem too. Counters feed the summary line.
+    """
+    def __init__(self, fields: List[str], log=print, catalog: Optional[LanguageCatalog] = None,
+                 require_any: Tuple[str, ...] = ()):
+        self.fields = list(fields)
+        self.log = log
+        self.catalog = catalog if catalog is not None else LANGUAGE_CATALOG
+        self.require_any = require_any
+        self.d_pos = self.fields.index("date") if "date" in self.fields else None
+        self.l_pos = self.fields.index("languages") if "languages" in self.fields else None
+        self.read = self.duplicates = self.dropped = 0
+
+    def check(self, row: tuple) -> Tuple[tuple, Optional[str]]:
+        """(normalised row, None) or (row, reason it cannot succeed)."""
+        self.read += 1
+        row = list(row)
+        key, problem = row[0], None
+        d_pos, l_pos = self.d_pos, self.l_pos
+        if d_pos is not None and row[d_pos]:
+            date = _normalize_date(row[d_pos])
+            if date is None:
+                problem = f"Pre-flight: '{row[d_pos]}' is not a valid date"
+            row[d_pos] = date
+        if l_pos is not None and row[l_pos] and self.catalog.names:
+            known = []
+            for lang in row[l_pos]:
+                label = self.catalog.resolve(lang)
+                if label is None:
+                    self.dropped += 1
+                    self.log(f"⚠️ Pre-flight: unknown language '{lang}' for {key} (not in the tenant's list) - ignored")
+                elif label not in known:
+                    known.append(label)
+            row[l_pos] = known or None
+        if not problem and (self.require_any or l_pos is not None) and \
+                all(not row[self.fields.index(f)] for f in (self.require_any or ("languages",))):
+            problem = "Pre-flight: no valid date or language left to apply"
+        return tuple(row), problem
+
+    def duplicate(self, key: str):
+        self.duplicates += 1
+        self.log(f"⚠️ Pre-flight: '{key}' appears more than once; the last row wins")
+
+    def summary(self, rejected: int, to_process: int) -> str:
+        return (f"🧮 Pre-flight: {self.read} row(s) read, {self.duplicates} duplicate(s) collapsed, {rejected} rejected, "
+                f"{self.dropped} unknown language(s) ignored -> {to_process} to process")
+
+
+def preflight_rows(rows: Iterable[tuple], fields: List[str], log=print,
+                   catalog: Optional[LanguageCatalog] = None, require_any: Tuple[str, ...] = ()) -> PreflightReport:
+    """Validate all rows at once (RowValidator); duplicate keys (case-insensitive) collapse
+    to the last occurrence, which keeps its own position."""
+    v = RowValidator(fields, log, catalog, require_any)
+    by_key: Dict[str, Tuple[int, tuple]] = {}
+    rejected: Dict[str, Tuple[str, str]] = {}
+    for idx, row in enumerate(rows):
+        row, problem = v.check(row)
+        key = row[0]
+        norm = key.strip().lower()
+        if norm in by_key or norm in rejected:
+            v.duplicate(key)
+            by_key.pop(norm, None); rejected.pop(norm, None)
+        if problem:
+            rejected[norm] = (key, problem)
+        else:
+            by_key[norm] = (idx, row)
+    report = PreflightReport(sorted(by_key.values(), key=lambda r: r[0]), list(rejected.values()),
+                             v.read, v.duplicates, v.dropped)
+    log(v.summary(len(report.rejected), len(report.rows)))
+    for key, reason in report.rejected:
+        log(f"❌ {key}: {reason}")
+    return report
+
+
+# ================================================================
+# Log pipeline (ring buffer drained by the UI + rotating file)
+# ================================================================
+_file_log_lock = threading.Lock()
+
+
+def _file_logger(name: str) -> logging.Logger:
+    """Logger 'csod.<name>' writing to the shared rotating log file (created on first use)."""
+    root = logging.getLogger("csod")
+    with _file_log_lock:
+        if not root.handlers:
+            root.setLevel(logging.INFO)
+            root.propagate = False
+            try:
+                os.makedirs(LOG_DIR, exist_ok=True)
+                handler = logging.handlers.RotatingFileHandler(
+                    os.path.join(LOG_DIR, "toolkit.log"), maxBytes=LOG_FILE_MAX_BYTES,
+                    backupCount=LOG_FILE_BACKUPS, encoding="utf-8")
+                handler.setFormatter(logging.Formatter("%(asctime)s [%(name)s] %(message)s"))
+            except OSError:
+                handler = logging.NullHandler()
+            root.addHandler(handler)
+    return root.getChild(name)
+
+
+class LogPipeline:
+    """Thread-safe bounded buffer between worker threads and a log widget.
+
+    put() is cheap and callable from any thread: the line goes to the rotating
+    file immediately and into a ring buffer of LOG_BUFFER_MAX lines (oldest
+    dropped if the UI falls behind). drain() hands the UI everything pending in
+    one batch.
+    """
+    def __init__(self, name: str):
+        self._lock = threading.Lock()
+        self._pending = collections.deque(maxlen=LOG_BUFFER_MAX)
+        self._dropped = 0
+        self._file = _file_logger(name)
+
+    def put(self, msg: str):
+        self._file.info(msg)
+        with self._lock:
+            if len(self._pending) == self._pending.maxlen:
+                self._dropped += 1
+            self._pending.append(msg)
+
+    def drain(self) -> List[str]:
+        with self._lock:
+            lines = list(self._pending)
+            self._pending.clear()
+            dropped, self._dropped = self._dropped, 0
+        if dropped:
+            lines.insert(0, f"… {dropped} line(s) not shown (see logs/toolkit.log)")
+        return lines
+
+    def clear(self):
+        with self._lock:
+            self._pending.clear()
+            self._dropped = 0
+
+
+# ================================================================
+# Step tracing (spans per row step, CSV + Chrome trace-event export)
+# ================================================================
+def _percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of values (0.0 when empty)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, min(len(ordered), int(-(-len(ordered) * pct // 100))) - 1)]
+
+
+class _Span:
+    __slots__ = ("tracer", "label", "t0")
+
+    def __init__(self, tracer: "Tracer", label: str):
+        self.tracer, self.label = tracer, label
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.tracer.record(self.label, self.t0, time.perf_counter(), failed=exc_type is not None)
+        return False
+
+
+class _NoSpan:
+    """Shared do-nothing span handed out while tracing is off."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NO_SPAN = _NoSpan()
+
+
+class Tracer:
+    """Collects (label, row, thread, start, duration) spans for one run.
+
+        with TRACER.span("course search"):
+            ...
+
+    While disabled, span() returns a shared no-op object and nothing is recorded.
+    """
+    def __init__(self):
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.events: List[tuple] = []  # (label, row, thread name, t0, secs, failed)
+        self.origin = 0.0
+
+    def start(self):
+        with self._lock:
+            self.events = []
+            self.origin = time.perf_counter()
+        self.enabled = True
+
+    def stop(self):
+        self.enabled = False
+
+    def set_row(self, key: str):
+        """Attribute the calling thread's following spans to row key."""
+        self._local.row = key
+
+    def span(self, label: str):
+        return _Span(self, label) if self.enabled else _NO_SPAN
+
+    def record(self, label: str, t0: float, t1: float, failed: bool = False):
+        if not self.enabled:
+            return
+        ev = (label, getattr(self._local, "row", ""), threading.current_thread().name, t0 - self.origin, t1 - t0, failed)
+        with self._lock:
+            self.events.append(ev)
+
+    def summary(self) -> List[str]:
+        """One line per step label: count, p50, p95, max and share of the summed step time."""
+        with self._lock:
+            events = list(self.events)
+        by_label: Dict[str, List[float]] = {}
+        for label, _row, _thread, _t0, secs, _failed in events:
+            by_label.setdefault(label, []).append(secs)
+        rows_total = sum(by_label.get("row", [])) or sum(sum(v) for v in by_label.values()) or 1.0
+        return [f"🧭 {label}: n={len(v)} p50={_percentile(v, 50):.2f}s p95={_percentile(v, 95):.2f}s "
+                f"max={max(v):.2f}s ({sum(v) / rows_total:.0%} of row time)"
+                for label, v in sorted(by_label.items(), key=lambda kv: -sum(kv[1]))]
+
+    def export_csv(self, path: str):
+        with self._lock:
+            events = list(self.events)
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            w = csv.writer(f)
+            w.writerow(["Row", "Step", "Thread", "Start (ms)", "Duration (ms)", "Failed"])
+            for label, row, thread, t0, secs, failed in sorted(events, key=lambda e: e[3]):
+                w.writerow([row, label, thread, f"{t0 * 1000:.1f}", f"{secs * 1000:.1f}", "yes" if failed else ""])
+
+    def export_chrome(self, path: str):
+        """Trace-event JSON for chrome://tracing / Perfetto (one track per worker thread)."""
+        with self._lock:
+            events = list(self.events)
+        tids: Dict[str, int] = {}
+        out = []
+        for label, row, thread, t0, secs, failed in events:
+            tid = tids.setdefault(thread, len(tids) + 1)
+            out.append({"name": label, "cat": "row" if label == "row" else "step", "ph": "X", "pid": 1, "tid": tid,
+                        "ts": round(t0 * 1e6), "dur": round(secs * 1e6), "args": {"row": row, "failed": failed}})
+        out += [{"name": "thread_name", "ph": "M", "pid": 1, "tid": tid, "args": {"name": name}} for name, tid in tids.items()]
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": out, "displayTimeUnit": "ms"}, f)
+
+    def export(self, mode: str, directory: str = TRACE_DIR) -> Tuple[str, str]:
+        """Write <mode>_<timestamp>.csv and .json into directory; returns both paths."""
+        os.makedirs(directory, exist_ok=True)
+        base = os.path.join(directory, f"{mode}_{time.strftime('%Y%m%d_%H%M%S')}")
+        self.export_csv(base + ".csv")
+        self.export_chrome(base + ".json")
+        return base + ".csv", base + ".json"
+
+
+TRACER = Tracer()
+
+
+# ================================================================
+# Wait engine (readiness-driven waits instead of fixed sleeps)
+# ================================================================
+# True once the document is loaded and no ASP.NET async postback / jQuery XHR is in flight.
+_PAGE_IDLE_JS = """
+if (document.readyState !== 'complete') return false;
+try {
+  if (window.Sys && Sys.WebForms && Sys.WebForms.PageRequestManager &&
+      Sys.WebForms.PageRequestManager.getInstance().get_isInAsyncPostBack()) return false;
+} catch (e) {}
+try { if (window.jQuery && jQuery.active > 0) return false; } catch (e) {}
+return true;
+"""
+
+# Tags the current window and hooks PageRequestManager.endRequest so a finished
+# partial postback (UpdatePanel) can be told apart from one that has not started yet.
+_POSTBACK_ARM_JS = """
+var w = window.__csodWait = window.__csodWait || {seq: 0};
+try {
+  if (!w.hooked && window.Sys && Sys.WebForms && Sys.WebForms.PageRequestManager) {
+    Sys.WebForms.PageRequestManager.getInstance().add_endRequest(function () { w.seq++; });
+    w.hooked = true;
+  }
+} catch (e) {}
+w.token = arguments[0];
+return w.seq;
+"""
+
+# Done when the window was replaced (full postback / redirect) or endRequest fired, and the page is idle.
+_POSTBACK_DONE_JS = """
+var w = window.__csodWait;
+var finished = !w || w.token !== arguments[0] || w.seq > arguments[1];
+if (!finished) return false;
+""" + _PAGE_IDLE_JS
+
+
+class WaitStats:
+    """Thread-safe record of how long each readiness wait took, per step label."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples: Dict[str, List[float]] = {}
+
+    def record(self, label: str, secs: float):
+        with self._lock:
+            self.samples.setdefault(label, []).append(secs)
+
+    def reset(self):
+        with self._lock:
+            self.samples = {}
+
+    def summary(self) -> List[str]:
+        with self._lock:
+            items = sorted(self.samples.items())
+        return [f"⏱️ {label}: n={len(v)} avg={sum(v)/len(v):.2f}s max={max(v):.2f}s" for label, v in items]
+
+
+WAIT_STATS = WaitStats()
+
+
+def _timed_wait(drv, label: str, condition, timeout: float = DEFAULT_TIMEOUT):
+    """WebDriverWait.until() that records its duration under label in WAIT_STATS."""
+    t0 = time.perf_counter()
+    try:
+        return WebDriverWait(drv, timeout, poll_frequency=WAIT_POLL,
+                             ignored_exceptions=(WebDriverException,)).until(condition)
+    finally:
+        t1 = time.perf_counter()
+        WAIT_STATS.record(label, t1 - t0)
+        TRACER.record(f"wait: {label}", t0, t1)
+
+
+def _wait_page_idle(drv, label: str, timeout: float = DEFAULT_TIMEOUT):
+    return _timed_wait(drv, label, lambda d: d.execute_script(_PAGE_IDLE_JS), timeout)
+
+
+class PostbackWatch:
+    """Wrap an action that posts back or navigates; leaving the block waits for it to finish.
+
+        with PostbackWatch(drv, "course search"):
+            sb.send_keys(Keys.RETURN)
+    """
+    def __init__(self, drv, label: str, timeout: float = DEFAULT_TIMEOUT):
+        self.drv = drv
+        self.label = label
+        self.timeout = timeout
+        self.token = f"{threading.get_ident()}-{time.perf_counter_ns()}"
+        self.seq = 0
+
+    def __enter__(self):
+        self.seq = self.drv.execute_script(_POSTBACK_ARM_JS, self.token) or 0
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            _timed_wait(self.drv, self.label,
+                        lambda d: d.execute_script(_POSTBACK_DONE_JS, self.token, self.seq), self.timeout)
+        return False
+
+
+# ================================================================
+# Shared Selenium helper functions
+# ================================================================
+
+# True when the edit form is loaded and shows course_name (title text or a title input value).
+_EDIT_PAGE_MATCHES_JS = """
+var name = arguments[0].trim().toLowerCase();
+if (!document.getElementById(arguments[1])) return false;
+if ((document.body.innerText || '').toLowerCase().indexOf(name) >= 0) return true;
+var els = document.querySelectorAll("input[type='text'], textarea");
+for (var i = 0; i < els.length; i++) {
+  if ((els[i].value || '').trim().toLowerCase() === name) return true;
+}
+return false;
+"""
+
+
+def _open_course_edit(drv, course_name: str, index: Optional[CourseIndex] = None):
+    """Open course_name's edit page: straight from the course index when cached, else via search."""
+    index = index or COURSE_INDEX
+    cached = index.lookup(course_name) if index else None
+    if cached:
+        try:
+            with TRACER.span("open edit page (cached)"), PostbackWatch(drv, "open edit page (cached)"):
+                drv.get(cached)
+            if drv.execute_script(_EDIT_PAGE_MATCHES_JS, course_name, ID_COURSE_SAVE_BTN):
+                return
+        except WebDriverException:
+            pass
+        _check_session(drv)
+        index.invalidate(course_name)  # renamed, deleted or URL no longer valid
+    if not drv.find_elements(By.ID, ID_COURSE_SEARCH_BOX):
+        drv.get(URL_COURSE_SEARCH)
+        _check_session(drv)
+    _search_and_open_course_edit(drv, course_name)
+    if index and drv.current_url.split('?')[0].lower() != URL_COURSE_SEARCH.lower():
+        index.store(course_name, drv.current_url)
+
+
+def _search_and_open_course_edit(drv, course_name: str):
+    """Search the catalog for course_name and open the first result's edit page."""
+    with TRACER.span("course search"):
+        sb = _timed_wait(drv, "search box", EC.presence_of_element_located((By.ID, ID_COURSE_SEARCH_BOX)))
+        sb.clear(); sb.send_keys(course_name)
+        with PostbackWatch(drv, "course search"):
+            sb.send_keys(Keys.RETURN)
+        menus = drv.find_elements(By.ID, ID_COURSE_ACTION_MENU)
+    if not menus:
+        raise RuntimeError(f"Course '{course_name}' not found in search results")
+    with TRACER.span("action menu"):
+        menus[0].click()
+        edit_btn = _timed_wait(drv, "action menu", EC.element_to_be_clickable((By.ID, ID_COURSE_EDIT_BTN)))
+    with TRACER.span("open edit page"), PostbackWatch(drv, "open edit page"):
+        edit_btn.click()
+
+
+_DATE_PARTS = re.compile(r"^\s*(\d{1,2})/(\d{1,2})/(\d{4})\s*$")
+
+
+def _same_date(current: str, wanted: str) -> bool:
+    """'1/2/2027' == '01/02/2027'; anything that is not M/D/YYYY is compared as trimmed text."""
+    a, b = _DATE_PARTS.match(current or ""), _DATE_PARTS.match(wanted or "")
+    if a and b:
+        return tuple(map(int, a.groups())) == tuple(map(int, b.groups()))
+    return (current or "").strip().lower() == (wanted or "").strip().lower()
+
+
+def _apply_review_date(drv, date_str: str, dry_run: bool = False) -> Optional[str]:
+    """Type date_str into the Review Date field of the open edit page; returns a change note,
+    None when the field already holds that date (nothing typed)."""
+    with TRACER.span("review date"):
+        fld = _timed_wait(drv, "edit form", EC.presence_of_element_located((By.ID, ID_REVIEW_DATE_FIELD)))
+        current = (fld.get_attribute("value") or "").strip()
+        if _same_date(current, date_str):
+            return None
+        if not dry_run:
+            fld.clear(); fld.send_keys(date_str)
+        return f"review date {current or '(empty)'} → {date_str}"
+
+
+# Language picker: label -> checkbox map built once per page (kept on window), then every
+# requested language resolved and toggled in the same call (arguments[2] = dry run: report
+# only). Exact (case-insensitive) label match first, else the first label containing the
+# name. Returns [[[lang, status, label], ...], all labels] with status selected | planned |
+# already | missing | failed; the label list feeds LANGUAGE_CATALOG.
+_LANG_APPLY_JS = """
+var root = document.getElementById(arguments[0]) || document;
+var map = window.__csodLangMap;
+if (!map || map.root !== root || !document.contains(map.items[0] && map.items[0].label)) {
+  map = {root: root, items: []};
+  var labels = root.querySelectorAll('label');
+  for (var i = 0; i < labels.length; i++) {
+    var lbl = labels[i], cb = null;
+    if (lbl.htmlFor) cb = document.getElementById(lbl.htmlFor);
+    for (var el = lbl.previousElementSibling; !cb && el; el = el.previousElementSibling)
+      if (el.tagName === 'INPUT') cb = el;
+    if (!cb) cb = lbl.querySelector('input[type=checkbox]');
+    var text = (lbl.textContent || '').trim();
+    if (cb && text) map.items.push({name: text.toLowerCase(), text: text, label: lbl, cb: cb});
+  }
+  window.__csodLangMap = map;
+}
+var out = [], dryRun = arguments[2];  // inside forEach, arguments is the callback's own
+arguments[1].forEach(function (lang) {
+  var want = lang.trim().toLowerCase(), hit = null;
+  map.items.forEach(function (it) { if (!hit && it.name === want) hit = it; });
+  map.items.forEach(function (it) { if (!hit && it.name.indexOf(want) >= 0) hit = it; });
+  if (!hit) { out.push([lang, 'missing', '']); return; }
+  if (hit.cb.checked) { out.push([lang, 'already', hit.text]); return; }
+  if (dryRun) { out.push([lang, 'planned', hit.text]); return; }
+  hit.label.click();
+  out.push([lang, hit.cb.checked ? 'selected' : 'failed', hit.text]);
+});
+return [out, map.items.map(function (it) { return it.text; })];
+"""
+
+# Number of labels in the opened picker (0 while its items are still loading).
+_LANG_COUNT_JS = "return (document.getElementById(arguments[0]) || document).querySelectorAll('label').length;"
+
+
+def _apply_languages(drv, course_name: str, langs: List[str], log,
+                     dry_run: bool = False) -> Tuple[Optional[str], List[str]]:
+    """Tick each language in the Available Languages picker of the open course edit page;
+    returns (change note ("+Spanish, +French") or None when nothing was ticked, names that
+    are missing from the picker or could not be ticked)."""
+    added, missing = [], []
+    with TRACER.span("languages"):
+        # open language dropdown
+        dd = _timed_wait(drv, "edit form", EC.presence_of_element_located((By.ID, ID_LANGUAGE_DROPDOWN)))
+        drv.execute_script("arguments[0].click();", dd)
+        try:
+            _timed_wait(drv, "language list", lambda d: d.execute_script(_LANG_COUNT_JS, ID_LANGUAGE_LIST), 5)
+        except TimeoutException:
+            pass  # nothing to pick from; every language is reported missing below
+
+        results, labels = drv.execute_script(_LANG_APPLY_JS, ID_LANGUAGE_LIST, langs, dry_run) or ([], [])
+        if LANGUAGE_CATALOG is not None:
+            LANGUAGE_CATALOG.update(labels)
+        for lang, status, label in results:
+            if status in ("selected", "planned"):
+                added.append(label)
+                log(f"  ✅ Selected: {label}" if status == "selected" else f"  📝 Would select: {label}")
+            elif status == "already":
+                log(f"  ℹ️ Already selected: {label}")
+            elif status == "failed":
+                missing.append(lang)
+                log(f"  ⚠️ Could not tick '{label}' for {course_name}")
+            else:
+                missing.append(lang)
+                log(f"  ⚠️ Missing language '{lang}' for {course_name}")
+
+        # close dropdown
+        drv.execute_script("arguments[0].click();", dd)
+        try:
+            _timed_wait(drv, "language list", EC.invisibility_of_element_located((By.ID, ID_LANGUAGE_LIST)), 5)
+        except TimeoutException:
+            pass
+    return ", ".join("+" + a for a in added) or None, missing
+
+def _save_course(drv):
+    """Click the course edit Save button and wait for the save round-trip to return."""
+    with TRACER.span("course save"):
+        save_btn = _timed_wait(drv, "save button", EC.element_to_be_clickable((By.ID, ID_COURSE_SAVE_BTN)))
+        with PostbackWatch(drv, "course save"):
+            drv.execute_script("arguments[0].click();", save_btn)
+
+
+def _edit_course(drv, course_name: str, date_str: Optional[str], langs: Optional[List[str]], log,
+                 dry_run: bool = False) -> Tuple[str, str]:
+    """Open the course once, apply date and/or languages, save once. Returns (ROW_* status, note):
+    skipped when the page already matches (no save), planned in a dry run (nothing saved),
+    failed when languages could not be applied and nothing else changed."""
+    _open_course_edit(drv, course_name)
+    notes, missing = [], []
+    if date_str:
+        notes.append(_apply_review_date(drv, date_str, dry_run))
+    if langs:
+        added, missing = _apply_languages(drv, course_name, langs, log, dry_run)
+        notes.append(added)
+    note = "; ".join(n for n in notes if n)
+    if missing:
+        if not note:
+            return ROW_FAILED, "Languages not applied: " + ", ".join(missing)
+        note += "; missing: " + ", ".join(missing)
+    if not note:
+        return ROW_SKIPPED, "No change"
+    if dry_run:
+        return ROW_PLANNED, note
+    _save_course(drv)
+    return ROW_SUCCESS, note
+
+
+def _safe_js_click(drv, element):
+    try:
+        # instant (non-smooth) scroll is synchronous, so no settle delay is needed
+        drv.execute_script("arguments[0].scrollIntoView({block: 'center'});", element)
+        element.click()
+    except Exception:
+        try:
+            drv.execute_script("arguments[0].click();", element)
+        except Exception as e:
+            raise e
+
+
+# Password dialog locators. All of them are evaluated together, once per poll, by the
+# scripts below, so the first one to match wins instead of each timing out in turn.
+_PWD_OK_XPATHS = [
+    "//div[contains(@id,'dlgPasswdReset')]//*[self::a or self::button or self::input][normalize-space()='OK' or @value='OK']",
+    "//div[contains(@id,'dlgPasswdReset')]//*[contains(@class,'backBtnFocus') and (normalize-space()='OK' or @value='OK')]",
+]
+_PWD_OK_CSS = "div[id*='dlgPasswdReset'] .cso-btn.cso-action"  # fallback: OK / CONFIRM / CONTINUE buttons
+_PWD_ERROR_XPATHS = [
+    "//*[@id='newPasswordTextBox' or @id='confirmPasswordTextBox']/preceding::span[contains(@class,'error')][1]",
+    "//*[contains(@class,'error') and contains(.,'password')]",
+    "//*[contains(text(),'cannot be the same as the previous 10')]",
+    "//*[contains(@class,'validation') and contains(@class,'error')]",
+    "//*[contains(@style,'red') and contains(.,'password')]",
+]
+_PWD_SUCCESS_XPATHS = [
+    "//*[contains(@class,'success') and contains(.,'Password')]",
+    "//*[contains(text(),'Password updated')]",
+    "//*[contains(text(),'Password changed')]",
+]
+
+# Shared JS: visible(el) ~ WebElement.is_displayed(); firstVisible(xpaths) -> first visible match.
+_PWD_JS_LIB = """
+function visible(el) {
+  if (!el || !el.getClientRects().length) return false;
+  var st = window.getComputedStyle(el);
+  return st.visibility !== 'hidden' && st.display !== 'none';
+}
+function firstVisible(xpaths, needText) {
+  for (var i = 0; i < xpaths.length; i++) {
+    var r = document.evaluate(xpaths[i], document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+    for (var j = 0; j < r.snapshotLength; j++) {
+      var el = r.snapshotItem(j);
+      if (visible(el) && (!needText || (el.innerText || '').trim())) return el;
+    }
+  }
+  return null;
+}
+"""
+
+# OK button of the manual-reset step, or 'fields' when the password boxes are already showing.
+_PWD_OK_JS = _PWD_JS_LIB + """
+var el = firstVisible(arguments[0], false);
+if (!el) {
+  var cands = document.querySelectorAll(arguments[1]);
+  for (var i = 0; i < cands.length && !el; i++) {
+    var c = cands[i], t = (c.innerText || '').trim().toUpperCase(), v = (c.value || '').trim().toUpperCase();
+    if (visible(c) && !c.disabled && (['OK', 'CONFIRM', 'CONTINUE'].indexOf(t) >= 0 || ['OK', 'CONFIRM', 'CONTINUE'].indexOf(v) >= 0)) el = c;
+  }
+}
+if (el && !el.disabled) return el;
+return visible(document.getElementById(arguments[2])) ? 'fields' : null;
+"""
+
+# Outcome of a password save, first condition to hold wins:
+#   ['error', text]    a visible validation message (reuse, complexity, mismatch, ...)
+#   ['success', text]  an explicit confirmation message
+#   ['closed', '']     the password fields are gone and no error is showing
+_PWD_OUTCOME_JS = _PWD_JS_LIB + """
+var err = firstVisible(arguments[0], true);
+if (err) return ['error', err.innerText.trim()];
+var ok = firstVisible(arguments[1], false);
+if (ok) return ['success', (ok.innerText || '').trim()];
+if (!visible(document.getElementById(arguments[2]))) return ['closed', ''];
+return null;
+"""
+
+
+def _click_ok_in_pwd_reset(drv, timeout: float = DEFAULT_TIMEOUT) -> bool:
+    """Click the dialog's OK button (any known locator, whichever shows first).
+    False when none appeared; True without a click when the password fields are already up."""
+    try:
+        el = _timed_wait(drv, "confirm OK",
+                         lambda d: d.execute_script(_PWD_OK_JS, _PWD_OK_XPATHS, _PWD_OK_CSS, ID_PASSWD_NEW_BOX), timeout)
+    except TimeoutException:
+        return False
+    if el != "fields":
+        _safe_js_click(drv, el)
+    return True
+
+
+def _wait_pwd_outcome(drv, timeout: float = DEFAULT_TIMEOUT) -> Tuple[str, str]:
+    """Poll error, success and dialog-closed conditions together after a password save;
+    returns the first that holds as (kind, text), ('timeout', '') if none did."""
+    try:
+        kind, text = _timed_wait(drv, "password outcome",
+                                 lambda d: d.execute_script(_PWD_OUTCOME_JS, _PWD_ERROR_XPATHS, _PWD_SUCCESS_XPATHS, ID_PASSWD_NEW_BOX),
+                                 timeout)
+        return kind, text
+    except TimeoutException:
+        return "timeout", ""
+
+
+# ================================================================
+# Error classification (what a failed row attempt means for the run)
+# ================================================================
+ERR_TRANSIENT, ERR_PERMANENT, ERR_SESSION = "transient", "permanent", "session"
+
+_TRANSIENT_ERRORS = (TimeoutException, StaleElementReferenceException, ElementClickInterceptedException,
+                     ElementNotInteractableException, NoSuchElementException, TimeoutError)
+
+
+def classify_error(exc: BaseException, drv=None) -> str:
+    """ERR_SESSION: browser gone or logged out (restart + retry); ERR_TRANSIENT: slow or
+    re-rendered page (retry); ERR_PERMANENT: anything else (course not found, ...)."""
+    text = str(exc).lower()
+    if isinstance(exc, (SessionExpired, InvalidSessionIdException, NoSuchWindowException, ConnectionRefusedError)) \
+            or type(exc).__name__ in ("MaxRetryError", "NewConnectionError") \
+            or (isinstance(exc, WebDriverException) and any(m in text for m in SESSION_FATAL_MARKERS)):
+        return ERR_SESSION
+    if drv is not None and _on_login_page(drv):
+        return ERR_SESSION
+    if isinstance(exc, _TRANSIENT_ERRORS) or (isinstance(exc, OSError) and not isinstance(exc, FileNotFoundError)):
+        return ERR_TRANSIENT
+    return ERR_PERMANENT
+
+
+def _on_login_page(drv) -> bool:
+    """True when drv was redirected to the login flow; a dead driver counts too."""
+    try:
+        return _is_login_url(drv.current_url)
+    except Exception:
+        return True
+
+
+def _error_text(exc: BaseException) -> str:
+    """First line of an exception, without the stack trace / docs link Selenium appends."""
+    text = (getattr(exc, "msg", None) or str(exc)).strip()
+    return text.splitlines()[0].split("; For documentation")[0] if text else type(exc).__name__
+
+
+# ================================================================
+# Run pipeline (bounded queues between the stages of one run, with per-stage stats)
+# ================================================================
+_END = object()  # end-of-stream marker on a stage queue
+
+
+class StageStats:
+    """Items handled and busy time of one stage; `queue` is its input queue (None for the reader)."""
+    def __init__(self, name: str, q: Optional[queue.Queue] = None):
+        self.name = name
+        self.queue = q
+        self.threads = 1
+        self.items = 0
+        self.busy = 0.0
+        self.max_depth = 0
+        self._lock = threading.Lock()
+
+    def add(self, secs: float):
+        with self._lock:
+            self.items += 1
+            self.busy += secs
+            if self.queue is not None:
+                self.max_depth = max(self.max_depth, self.queue.qsize())
+
+    def snapshot(self, wall: float) -> dict:
+        wall = max(wall, 1e-6)
+        return {"stage": self.name, "items": self.items, "per_sec": round(self.items / wall, 2),
+                "busy": round(min(self.busy / (wall * max(self.threads, 1)), 1.0), 3),
+                "depth": self.queue.qsize() if self.queue is not None else 0, "max_depth": self.max_depth,
+                "capacity": self.queue.maxsize if self.queue is not None else 0}
+
+
+class RunPipeline:
+    """Queues and stats of one run: read -> parsed -> validate -> work -> execute -> results -> write.
+
+    Every queue is bounded, so a slow stage holds the ones before it back instead of
+    letting rows pile up in memory (the validator holds back only duplicate keys and
+    rejected rows until the read ends; `last_index` lets executors drop superseded rows). snapshot() can be polled while the run goes; the
+    stage with the highest busy share is the bottleneck.
+    """
+    def __init__(self, size: int = PIPELINE_QUEUE_SIZE):
+        self.parsed: queue.Queue = queue.Queue(size)
+        self.work: queue.Queue = queue.Queue(size)
+        self.results: queue.Queue = queue.Queue(size)
+        self.stages = {"read": StageStats("read"), "validate": StageStats("validate", self.parsed),
+                       "execute": StageStats("execute", self.work), "write": StageStats("write", self.results)}
+        self.last_index: Dict[str, int] = {}  # row key -> index of its last row (duplicates: last wins)
+        self.queued = 0                       # rows handed to the executors so far
+        self.first_row = threading.Event()    # a valid row was found, or validation ended
+        self.validated = threading.Event()    # validator finished (nothing more will be queued)
+        self.closed = threading.Event()       # executors are gone: stages stop feeding them
+        self.writer: Optional[threading.Thread] = None
+        self.t0 = time.perf_counter()
+
+    def put(self, q: queue.Queue, item, stopped: Callable[[], bool]) -> bool:
+        """Blocking put that gives up (False) once stopped() or the pipeline is closed."""
+        while not (stopped() or self.closed.is_set()):
+            try:
+                q.put(item, timeout=0.2)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def get(self, q: queue.Queue, stopped: Callable[[], bool]):
+        """Blocking get; _END once stopped() or the pipeline is closed."""
+        while not (stopped() or self.closed.is_set()):
+            try:
+                return q.get(timeout=0.2)
+            except queue.Empty:
+                continue
+        return _END
+
+    def snapshot(self) -> List[dict]:
+        wall = time.perf_counter() - self.t0
+        return [st.snapshot(wall) for st in self.stages.values()]
+
+    def summary(self) -> List[str]:
+        snap = self.snapshot()
+        parts = [f"{s['stage']} {s['items']} ({s['per_sec']:.1f}/s, {s['busy']:.0%} busy"
+                 + (f", queue max {s['max_depth']}/{s['capacity']})" if s["capacity"] else ")") for s in snap]
+        top = max(snap, key=lambda s: s["busy"])
+        return ["🚦 Stages: " + " | ".join(parts), f"🚦 Bottleneck: {top['stage']} ({top['busy']:.0%} busy)"]
+
+
+class RunProgress:
+    """Live counters of the current run: updated by the run's threads, read with snapshot()
+    by a UI at its own refresh rate (no widget is ever touched from a worker thread).
+
+    The rate counts rows finished in this run over the last PROGRESS_RATE_WINDOW seconds;
+    rows resumed from the journal count as done but not towards the rate.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.started = time.monotonic()
+            self.origin: Optional[float] = None  # first row handed to a browser
+            self.total = 0                       # rows to process (estimate until validation ends)
+            self.done = 0
+            self.counts = collections.Counter()  # ROW_* status / "resumed" / "rejected" -> rows
+            self.finished_at: Optional[float] = None
+            self.current = "Reading workbook"
+            self._times: collections.deque = collections.deque()
+
+    def expect(self, total: int):
+        with self._lock:
+            self.total = total
+
+    def step(self, text: str):
+        """What the run is doing right now (login, a row key, a browser restart, ...)."""
+        with self._lock:
+            self.current = text
+
+    def begin(self):
+        """Rows start going to the browsers: the rate is measured from here."""
+        with self._lock:
+            self.origin = time.monotonic()
+            self.current = "Processing rows"
+
+    def reject(self):
+        with self._lock:
+            self.counts["rejected"] += 1
+            self.total = max(self.total - 1, 0)
+
+    def row(self, status: str, resumed: bool = False):
+        now = time.monotonic()
+        with self._lock:
+            self.done += 1
+            self.counts["resumed" if resumed else status] += 1
+            if not resumed:
+                self._times.append(now)
+
+    def finish(self, text: str):
+        with self._lock:
+            self.current = text
+            self.finished_at = time.monotonic()
+
+    def snapshot(self) -> dict:
+        """done / total / per-status counts, rate_per_min, eta_secs (None while unknown) and step."""
+        with self._lock:
+            now = self.finished_at or time.monotonic()
+            while self._times and self._times[0] < now - PROGRESS_RATE_WINDOW:
+                self._times.popleft()
+            span = min(PROGRESS_RATE_WINDOW, now - (self.origin or now))
+            rate = len(self._times) / span * 60 if span >= 1 and self._times else 0.0
+            left = max(self.total - self.done, 0)
+            return {"done": self.done, "total": max(self.total, self.done), "rate_per_min": round(rate, 1),
+                    "eta_secs": round(left / rate * 60) if rate and left and self.finished_at is None else None,
+                    "elapsed_secs": round(now - self.started), "step": self.current,
+                    "running": self.finished_at is None, **{k: self.counts[k] for k in (
+                        ROW_SUCCESS, ROW_FAILED, ROW_SKIPPED, ROW_PLANNED, "resumed", "rejected")}}
+
+
+# ================================================================
+# Mode runners (UI-free batch logic shared by the GUI and the CLI)
+# ================================================================
+RUN_OK, RUN_LOGIN_FAILED, RUN_INPUT_FAILED = "ok", "login", "input"
+# Rows were left over because no browser could be restarted (not cancelled): the login
+# was lost (RUN_SESSION_LOST) or Chrome itself failed (RUN_INCOMPLETE).
+RUN_SESSION_LOST, RUN_INCOMPLETE = "session", "incomplete"
+ROW_NOT_PROCESSED = "Not processed – resume with Start/run"
+
+
+class ModeRunner:
+    """One mode's batch: read / validate the workbook, log in, process rows, collect results.
+
+    Callers plug in log(msg) for log lines and on_row(key, status, msg, secs, done, total)
+    for per-row progress (status is a ROW_* value); both are called from worker threads.
+    """
+    mode_key = "mode"                      # journal/log prefix and CLI --mode name
+    columns: Tuple[Column, ...] = ()       # workbook schema
+    require_any: Tuple[str, ...] = ()      # at least one of these optional fields per row
+    has_secrets = False                    # rows hold passwords: copies of the workbook must not outlive the run
+    url = URL_COURSE_SEARCH
+    ready_locator = (By.ID, ID_COURSE_SEARCH_BOX)
+    login_msg = "Log in to LKQYou PROD, then click OK in this dialog."
+    failed_header = ["Course Name", "Error"]
+    full_header = ["Course Name", "Status", "Message"]
+
+    def __init__(self, browser: BrowserManager, log: Callable[[str], None] = print, on_row=None):
+        self.browser = browser
+        self.log = log
+        self.on_row = on_row or (lambda *args: None)
+        self.success_items: List[str] = []
+        self.failed_items: List[Tuple[str, str]] = []
+        self.skipped_items: List[Tuple[str, str]] = []  # already as requested, nothing saved
+        self.planned_items: List[Tuple[str, str]] = []  # dry run: (key, change that would be saved)
+        self.stop_flag = False
+        self.workers = 1
+        self.use_http = False
+        self.http: Optional[HttpEngine] = None
+        self.journal: Optional[RunJournal] = None
+        self.resume: Dict[int, dict] = {}  # row index -> journal record of rows to skip
+        self.trace = TRACE_ENABLED         # record per-step spans and export them after the run
+        self.dry_run = False               # read and compare only; report planned changes, save nothing
+        self.results_target: Optional[str] = None  # CSV to stream results to (None = new file in RESULTS_DIR per run)
+        self.results_path: Optional[str] = None    # streamed results file of the current / last run
+        self.results: Optional[ResultWriter] = None
+        self._prompt = None    # login prompt / error callbacks of the current run (re-login after a crash)
+        self._on_error = None
+        self.pipeline: Optional[RunPipeline] = None  # stages of the current / last run (snapshot() for stats)
+        self.progress = RunProgress()      # live counts / rate / ETA of the current run (safe to poll)
+        self.history_rows: List[tuple] = []  # (row, key, status, error, secs) of this run, for RUN_HISTORY
+        self.unprocessed = 0               # rows left over when no browser could be restarted
+
+    def open_journal(self, excel_path: str) -> Dict[int, dict]:
+        """Open excel_path's journal; returns its completed rows (assign to .resume to skip them)."""
+        self.resume = {}
+        self.journal = RunJournal.for_workbook(self.mode_key, excel_path)
+        return self.journal.completed()
+
+    def run(self, excel_path: str, prompt=None, on_error=None) -> str:
+        """Start reading / validating the workbook, log in meanwhile and process every row;
+        returns a RUN_* status. The login waits only for the first valid row, so a sheet
+        with no valid rows never opens the browser."""
+        self.stop_flag = False
+        for items in (self.success_items, self.failed_items, self.skipped_items, self.planned_items):
+            items.clear()
+        self.results_path = None
+        self._prompt, self._on_error = prompt, on_error
+        self.progress.reset()
+        self.history_rows = []
+        self.unprocessed = 0
+        self.browser.recovery_failure = None
+        rows = self.open_rows(excel_path)
+        if rows is None:
+            self.progress.finish("Workbook could not be read")
+            return RUN_INPUT_FAILED
+        pipe = self.pipeline = RunPipeline()
+        WAIT_STATS.reset()
+        if COURSE_INDEX: COURSE_INDEX.reset_counters()
+        self.results = (ResultWriter(self.results_target, self.full_header) if self.results_target
+                        else ResultWriter.for_run(self.mode_key, self.full_header))
+        self.results_path = self.results.path
+        for name, target, args in (("write", self._write_stage, (pipe,)), ("read", self._read_stage, (rows, pipe)),
+                                   ("validate", self._validate_stage, (pipe,))):
+            thread = threading.Thread(target=target, args=args, name=name, daemon=True)
+            thread.start()
+            if name == "write":
+                pipe.writer = thread
+        try:
+            pipe.first_row.wait()
+            if pipe.validated.is_set() and not pipe.queued:
+                if not pipe.stages["validate"].items:
+                    self.log("❌ No valid rows found in Excel.")
+                    self.progress.finish("No valid rows")
+                    return RUN_OK
+                drivers = []  # every row was rejected: write the results, skip the browser
+            else:
+                self.progress.step("Logging in")
+                if not self.browser.navigate_and_login(self.url, self.ready_locator, self.login_msg, prompt, on_error):
+                    self.progress.finish("Login failed")
+                    return RUN_LOGIN_FAILED
+                drivers = self.acquire_drivers(rows.total)
+            self.log(f"🧾 Results are written to {self.results_path} as rows finish.")
+            self.process_rows(drivers, pipe)
+        finally:
+            self._close_pipeline(pipe)
+            if self.progress.finished_at is None:
+                self.progress.finish("Cancelled" if self.stop_flag else
+                                     "Stopped: no working browser" if self.unprocessed else "Finished")
+        self.save_history(excel_path, pipe)
+        if self.unprocessed:
+            return RUN_SESSION_LOST if self.browser.recovery_failure == "login" else RUN_INCOMPLETE
+        return RUN_OK
+
+    def _close_pipeline(self, pipe: RunPipeline):
+        """Stop feeding the executors, let the writer finish its backlog and close the results file."""
+        if pipe.writer is None:
+            return
+        pipe.closed.set()
+        pipe.validated.wait(1.0)  # a validator blocked on a full queue notices `closed` within 0.2 s
+        pipe.results.put(_END)
+        pipe.writer.join()
+        pipe.writer = None
+        self.results.close()
+
+    # --- Pipeline stages (read and validate run from the start of run(), write with the executors) ---
+    def _stopped(self) -> bool:
+        return self.stop_flag
+
+    def _read_stage(self, rows: WorkbookRows, pipe: RunPipeline):
+        """Stage 1: stream (index, row) into pipe.parsed in one pass over the workbook,
+        noting each key's last row index (last-row-wins duplicates) on the way."""
+        st = pipe.stages["read"]
+        try:
+            t = time.perf_counter()
+            for idx, row in enumerate(rows):
+                pipe.last_index[row[0].strip().lower()] = idx
+                st.add(time.perf_counter() - t)
+                if not pipe.put(pipe.parsed, (idx, row), self._stopped):
+                    return
+                t = time.perf_counter()
+            self.progress.expect(len(pipe.last_index))  # refined as rows are rejected / validated
+        except Exception as e:
+            self.log(f"❌ Excel read error: {e}")
+        finally:
+            pipe.put(pipe.parsed, _END, self._stopped)
+
+    def _validate_stage(self, pipe: RunPipeline):
+        """Stage 2: RowValidator per row as the reader streams them.
+
+        A valid row whose key was not seen before goes straight to pipe.work. Later rows of
+        a key already seen and rejected rows (few) are held until the read ends, when
+        pipe.last_index is complete: only each key's last row is then released or rejected.
+        An earlier row superseded that way is dropped by the executors when they pick it up
+        (one that already ran is followed by the later row: the last row still wins).
+        """
+        st = pipe.stages["validate"]
+        v = RowValidator([c.field for c in self.columns], self.log, require_any=self.require_any)
+        rejected = superseded = 0
+        forwarded: Dict[str, Tuple[int, str]] = {}  # key -> (index, key as written) of the row sent to the executors
+        held: List[tuple] = []                       # (idx, row, problem) decided once the read ends
+        held_keys: set = set()
+        try:
+            while True:
+                item = pipe.get(pipe.parsed, self._stopped)
+                if item is _END:
+                    break
+                t = time.perf_counter()
+                idx, row = item
+                row, problem = v.check(row)
+                st.add(time.perf_counter() - t)  # busy time excludes waiting on a full queue below
+                norm = row[0].strip().lower()
+                if problem or norm in forwarded or norm in held_keys:
+                    held.append((idx, row, problem))
+                    held_keys.add(norm)
+                elif pipe.put(pipe.work, (idx, row), self._stopped):
+                    forwarded[norm] = (idx, row[0])
+                    pipe.queued += 1
+                    pipe.first_row.set()
+            for norm, (idx, key) in forwarded.items():
+                if pipe.last_index.get(norm, idx) != idx:
+                    superseded += 1
+                    v.duplicate(key)
+            for idx, row, problem in held:
+                if pipe.last_index.get(row[0].strip().lower(), idx) != idx:
+                    v.duplicate(row[0])
+                elif problem:
+                    rejected += 1
+                    self.progress.reject()
+                    self.log(f"❌ {row[0]}: {problem}")
+                    pipe.put(pipe.results, ("rejected", idx, row[0], ROW_FAILED, problem, 0.0), self._stopped)
+                elif pipe.put(pipe.work, (idx, row), self._stopped):
+                    pipe.queued += 1
+            self.log(v.summary(rejected, pipe.queued - superseded))
+            self.progress.expect(pipe.queued - superseded)
+        finally:
+            pipe.validated.set()
+            pipe.first_row.set()
+
+    def _write_stage(self, pipe: RunPipeline):
+        """Stage 4: the only place results are recorded: journal, item lists, log line,
+        results file and on_row, one finished row at a time (executors never wait on I/O)."""
+        st = pipe.stages["write"]
+        done = 0
+        while True:
+            item = pipe.results.get()
+            if item is _END:
+                return
+            t = time.perf_counter()
+            try:
+                self._record(item, done + 1, pipe)
+            except Exception as e:  # keep draining: executors must never block on a dead writer
+                self.log(f"❌ Could not record the result of {item[2]}: {e}")
+            if item[0] != "rejected":
+                done += 1
+            st.add(time.perf_counter() - t)
+
+    def _record(self, item: tuple, done: int, pipe: RunPipeline):
+        """One ("row" | "resumed" | "rejected" | "unprocessed", idx, key, status, msg, secs) result."""
+        kind, idx, key, status, msg, secs = item
+        if kind == "row" and self.journal:
+            self.journal.append(idx, key, status, msg)
+        if status == ROW_SUCCESS:
+            if kind == "row": self.log(f"✅ Updated: {key} ({secs:.1f}s)")
+            self.success_items.append(key)
+        elif status == ROW_SKIPPED:
+            if kind == "row": self.log(f"⏭️ Unchanged: {key} ({secs:.1f}s)")
+            self.skipped_items.append((key, msg))
+        elif status == ROW_PLANNED:
+            if kind == "row": self.log(f"📝 Would update: {key}: {msg} ({secs:.1f}s)")
+            self.planned_items.append((key, msg))
+        else:
+            if kind == "row": self.log(f"❌ Failed: {key}: {msg} ({secs:.1f}s)")
+            self.failed_items.append((key, msg))
+        self.results.write(key, status, msg)
+        if kind == "row":
+            self.history_rows.append((idx, key, status, msg if status == ROW_FAILED else "", round(secs, 3)))
+        if kind != "rejected":
+            self.progress.row(status, resumed=kind == "resumed")
+            self.on_row(key, status, msg, secs, done, max(pipe.queued, done, 1))
+
+    # --- Row processing (single driver or worker pool) ---
+    def acquire_drivers(self, rows: int) -> list:
+        """Main (logged-in) driver plus cloned workers when workers > 1."""
+        self.http = None
+        if self.use_http:
+            self.http = HttpEngine.from_driver(self.browser.ensure_driver(), self.browser)
+            self.log("⚡ HTTP engine on (browser used only as fallback).")
+        n = max(1, min(self.workers, POOL_MAX_WORKERS, rows))
+        if n == 1:
+            drv = self.browser.ensure_driver()
+            self.browser.session_cookies = self.browser.export_cookies(drv)  # to restore the login after a crash
+            return [drv]
+        self.log(f"🧵 Starting {n} browser workers...")
+        self.progress.step(f"Starting {n} browsers")
+        drivers = self.browser.ensure_pool(n, self.url, self.ready_locator, log=self.log)
+        self.log(f"🧵 {len(drivers)} worker(s) ready.")
+        return drivers
+
+    def via_http(self, key: str, call):
+        """call(self.http) when the HTTP engine is on; None means "do this row in the browser"."""
+        if not self.http:
+            return None
+        try:
+            with TRACER.span("http engine"):
+                return call(self.http)
+        except HttpEngineError as e:
+            self.log(f"  ↩️ {key}: browser fallback ({e})")
+            return None
+
+    def recover_driver(self, drv):
+        """Restart a crashed / logged-out driver through the BrowserManager; None if that failed."""
+        self.log("♻️ Browser session lost; restarting it...")
+        self.progress.step("Restarting a lost browser")
+        new = self.browser.recover_driver(drv, self.url, self.ready_locator, self.login_msg, log=self.log,
+                                          prompt=self._prompt, on_error=self._on_error)
+        self.log("♻️ Browser restarted; continuing." if new else "❌ Browser could not be restarted.")
+        return new
+
+    def recycle_driver(self, drv, reason: str):
+        """Swap a long-running driver for a fresh one with the same login (between rows)."""
+        before = self.browser.driver_rss_mb(drv)
+        t0 = time.perf_counter()
+        self.progress.step(f"Recycling a browser ({reason})")
+        new = self.browser.recycle_driver(drv, self.url, self.ready_locator, self.login_msg, log=self.log,
+                                          prompt=self._prompt, on_error=self._on_error)
+        if new is None:
+            self.log(f"❌ Browser could not be recycled ({reason}).")
+            return None
+        if new is drv:
+            self.log(f"⚠️ Browser not recycled ({reason}); continuing with the old one.")
+            return drv
+        after = self.browser.driver_rss_mb(new)
+        mem = f", RSS {before:.0f} → {after:.0f} MB" if before is not None and after is not None else ""
+        self.log(f"♻️ Browser recycled ({reason}) in {time.perf_counter() - t0:.1f}s{mem}")
+        return new
+
+    def open_rows(self, excel_path: str) -> Optional[WorkbookRows]:
+        try:
+            return WorkbookRows(excel_path, self.columns, self.log, self.require_any)
+        except Exception as e:
+            self.log(f"❌ Excel load error: {e}")
+            return None
+
+    def process_rows(self, drivers: list, pipe: RunPipeline):
+        """Stage 3: one executor thread per driver takes rows from pipe.work while the
+        writer thread records the outcomes.
+
+        Failed attempts are classified (classify_error): transient ones go back on a retry
+        heap with exponential backoff, a lost session restarts the worker's driver first.
+        """
+        lock = threading.Lock()
+        retries: List[tuple] = []  # heap of (due, seq, attempt, idx, row)
+        state = {"exhausted": False, "skipped": 0, "active": 0, "retried": 0, "restarts": 0, "seq": 0, "superseded": 0}
+        busy: set = set()  # keys of the rows in flight
+        execute = pipe.stages["execute"]
+        execute.threads = max(len(drivers), 1)
+
+        def take(attempt, idx, row):
+            """(attempt, idx, row) if it can run now (caller holds lock). A row superseded by a
+            later one of the same key is dropped; one whose key is in flight on another
+            worker waits on the retry heap, so two rows of a key never run at once."""
+            norm = row[0].strip().lower()
+            if pipe.last_index.get(norm, idx) != idx:
+                state["superseded"] += 1
+                return None
+            if norm in busy:
+                state["seq"] += 1
+                heapq.heappush(retries, (time.monotonic() + WAIT_POLL, state["seq"], attempt, idx, row))
+                return None
+            busy.add(norm)
+            state["active"] += 1
+            return attempt, idx, row
+
+        def next_row():
+            """Next (attempt, idx, row) to do, or None; journal-completed rows are skipped here.
+
+            Due retries come first. While the validator may still queue rows, retries are
+            pending or rows are in flight (and may fail), an idle worker waits instead of leaving.
+            """
+            while not self.stop_flag:
+                with lock:
+                    while retries and retries[0][0] <= time.monotonic():
+                        _, _, attempt, idx, row = heapq.heappop(retries)
+                        item = take(attempt, idx, row)
+                        if item:
+                            return item
+                    while True:
+                        try:
+                            idx, row = pipe.work.get_nowait()
+                        except queue.Empty:
+                            break
+                        rec = self.resume.get(idx)
+                        if rec and rec.get("key") == row[0]:
+                            state["skipped"] += 1
+                            pipe.put(pipe.results, ("resumed", idx, row[0], rec.get("status", ROW_SUCCESS),
+                                                    rec.get("msg", ""), 0.0), self._stopped)
+                            continue
+                        item = take(1, idx, row)
+                        if item:
+                            return item
+                    if pipe.validated.is_set() and pipe.work.empty() and not retries and not state["active"]:
+                        state["exhausted"] = True
+                        return None
+                    delay = retries[0][0] - time.monotonic() if retries else WAIT_POLL
+                time.sleep(min(max(delay, 0.01), WAIT_POLL))
+            return None
+
+        def worker(drv):
+            while drv is not None or not drivers:
+                item = next_row()
+                if item is None:
+                    return
+                attempt, idx, row = item
+                TRACER.set_row(row[0])
+                self.progress.step(f"Row {row[0]}" + (f" (attempt {attempt})" if attempt > 1 else ""))
+                t0 = time.perf_counter()
+                kind = ERR_PERMANENT
+                try:
+                    key, status, msg = self.process_one(drv, row)
+                    if status == ROW_FAILED and drv is not None and _on_login_page(drv):
+                        kind = ERR_SESSION  # "not found" only because the session expired
+                except Exception as e:
+                    key, status, msg = row[0], ROW_FAILED, _error_text(e)
+                    kind = classify_error(e, drv)
+                t1 = time.perf_counter()
+                secs = t1 - t0
+                TRACER.record("row", t0, t1, failed=status == ROW_FAILED)
+                execute.add(secs)
+                reason = None
+                if drv is not None and not (status == ROW_FAILED and kind == ERR_SESSION):
+                    reason = self.browser.count_row(drv)  # recycled once this row is recorded
+                if status == ROW_FAILED and kind == ERR_SESSION:
+                    drv = self.recover_driver(drv)
+                    with lock:
+                        state["restarts"] += drv is not None
+                if status == ROW_FAILED and kind != ERR_PERMANENT and attempt < RETRY_MAX_ATTEMPTS and not self.stop_flag:
+                    delay = min(RETRY_BACKOFF * 2 ** (attempt - 1), RETRY_BACKOFF_MAX)
+                    self.log(f"🔁 {key}: attempt {attempt}/{RETRY_MAX_ATTEMPTS} failed ({kind}: {msg}); retrying in {delay:.0f}s")
+                    with lock:
+                        state["seq"] += 1
+                        state["retried"] += 1
+                        heapq.heappush(retries, (time.monotonic() + delay, state["seq"], attempt + 1, idx, row))
+                        state["active"] -= 1
+                        busy.discard(row[0].strip().lower())
+                else:
+                    pipe.results.put(("row", idx, key, status, msg, secs))  # the writer always drains
+                    with lock:
+                        state["active"] -= 1
+                        busy.discard(row[0].strip().lower())
+                if reason:
+                    drv = self.recycle_driver(drv, reason)
+
+        if self.trace:
+            TRACER.start()
+        self.progress.begin()
+        try:
+            if len(drivers) <= 1:
+                worker(drivers[0] if drivers else None)
+            else:
+                threads = [threading.Thread(target=worker, args=(d,), name=f"worker-{i}", daemon=True)
+                           for i, d in enumerate(drivers, 1)]
+                for t in threads: t.start()
+                for t in threads: t.join()
+            if not state["exhausted"] and not self.stop_flag:
+                self.unprocessed = self._report_unprocessed(pipe, [r[3:] for r in sorted(retries)])
+        finally:
+            TRACER.stop()
+            self._close_pipeline(pipe)  # item lists are complete after this
+        if self.journal:
+            self.journal.close(finished=state["exhausted"] and not self.stop_flag)
+        if self.unprocessed:
+            self.log(f"⚠️ {self.unprocessed} row(s) not processed: no working browser left. Start again to resume them.")
+        if state["retried"] or state["restarts"]:
+            self.log(f"🔁 {state['retried']} retried attempt(s), {state['restarts']} browser restart(s).")
+        if state["skipped"]:
+            self.log(f"⏭️ Resumed: {state['skipped']} row(s) already completed in an earlier run were skipped.")
+        counts = [(len(self.planned_items), "to change (dry run)") if self.dry_run else (len(self.success_items), "updated"),
+                  (len(self.skipped_items), "unchanged"), (len(self.failed_items), "failed")]
+        self.log("📊 " + ", ".join(f"{n} {label}" for n, label in counts))
+        for line in (WAIT_STATS.summary() + (COURSE_INDEX.summary() if COURSE_INDEX else []) + self.browser.memory_summary()
+                     + pipe.summary()):
+            self.log(line)
+        if self.trace:
+            self.export_trace()
+
+    def save_history(self, excel_path: str, pipe: RunPipeline):
+        """Record the run in RUN_HISTORY (if any row reached a browser) and log how it
+        compares with the earlier runs of this mode."""
+        p = self.progress
+        if RUN_HISTORY is None or p.origin is None:
+            return
+        secs = [r[4] for r in self.history_rows]
+        wall = max(p.finished_at - p.origin, 1e-6)
+        steps = []
+        if self.trace:
+            by_label: Dict[str, List[float]] = {}
+            for label, _row, _thread, _t0, d, _failed in list(TRACER.events):
+                by_label.setdefault(label, []).append(d)
+            steps = [(label, len(v), *(round(x, 3) for x in (_percentile(v, 50), _percentile(v, 95), max(v), sum(v))))
+                     for label, v in by_label.items()]
+        run = {"mode": self.mode_key, "started": time.time() - (time.monotonic() - p.started), "secs": round(wall, 1),
+               "workbook": os.path.basename(excel_path), "workbook_hash": file_hash(excel_path), "host": socket.gethostname(),
+               "browsers": pipe.stages["execute"].threads, "http": int(self.use_http), "dry_run": int(self.dry_run),
+               "cancelled": int(self.stop_flag), "processed": len(secs),
+               **{k: p.counts[k] for k in (ROW_SUCCESS, ROW_FAILED, ROW_SKIPPED, ROW_PLANNED, "resumed", "rejected")},
+               "rate_per_min": round(len(secs) / wall * 60, 2),
+               "p50_secs": round(_percentile(secs, 50), 3), "p95_secs": round(_percentile(secs, 95), 3)}
+        try:
+            run_id = RUN_HISTORY.record(run, self.history_rows, steps)
+            flags = RUN_HISTORY.regressions(run_id)
+        except (sqlite3.Error, OSError) as e:
+            self.log(f"⚠️ Run history not saved: {e}")
+            return
+        self.log(f"🗃️ Run #{run_id} recorded: {run['rate_per_min']:.1f} rows/min, median row {run['p50_secs']:.2f}s, "
+                 f"{run[ROW_FAILED] / max(len(secs), 1):.0%} failed")
+        for flag in flags:
+            self.log(f"📉 Slower / worse than usual: {flag}")
+
+    def _report_unprocessed(self, pipe: RunPipeline, left: List[tuple]) -> int:
+        """No browser left: every row still waiting for a retry, queued or yet to be validated
+        goes to the results as failed (ROW_NOT_PROCESSED); the journal keeps them open for
+        the next Start / run. Returns their number."""
+        n = 0
+        def report(idx, row) -> bool:
+            if pipe.last_index.get(row[0].strip().lower(), idx) != idx:
+                return False  # superseded by a later row of the same key
+            rec = self.resume.get(idx)
+            if rec and rec.get("key") == row[0]:
+                item = ("resumed", idx, row[0], rec.get("status", ROW_SUCCESS), rec.get("msg", ""), 0.0)
+            else:
+                item = ("unprocessed", idx, row[0], ROW_FAILED, ROW_NOT_PROCESSED, 0.0)
+            return pipe.put(pipe.results, item, self._stopped) and item[0] == "unprocessed"
+        for idx, row in left:
+            n += report(idx, row)
+        while not self.stop_flag:
+            try:
+                idx, row = pipe.work.get(timeout=WAIT_POLL)
+            except queue.Empty:
+                if pipe.validated.is_set() and pipe.work.empty():
+                    break
+                continue
+            n += report(idx, row)
+        return n
+
+    def export_trace(self):
+        """Log the per-step percentiles of the last run and write its CSV / Chrome trace files."""
+        for line in TRACER.summary():
+            self.log(line)
+        try:
+            csv_path, json_path = TRACER.export(self.mode_key)
+            self.log(f"🧭 Trace written: {csv_path} (+ .json for chrome://tracing)")
+        except OSError as e:
+            self.log(f"⚠️ Could not write trace files: {e}")
+
+    def process_one(self, drv, row) -> Tuple[str, str, str]:
+        """Handle one workbook row; returns (key, ROW_* status, message)."""
+        raise NotImplementedError
+
+    # --- Exports: copies / conversions of the streamed results file (passwords are never in it) ---
+    def export_failed(self, path: str):
+        _copy_results(self.results_path, path, self.failed_header, statuses=(ROW_FAILED.title(),), columns=(0, 2))
+
+    def export_full(self, path: str):
+        _copy_results(self.results_path, path, self.full_header)
+
+
+class ReviewDateRunner(ModeRunner):
+    mode_key = "review"
+    columns = REVIEW_COLUMNS
+
+    def process_one(self, drv, row):
+        course, date_str = row
+        res = self.via_http(course, lambda h: h.update_course(course, date_str=date_str, dry_run=self.dry_run))
+        return (course,) + (res or self._update_review_date(drv, course, date_str))
+
+    def _update_review_date(self, drv, course_name: str, date_str: str) -> Tuple[str, str]:
+        return _edit_course(drv, course_name, date_str, None, self.log, self.dry_run)
+
+
+class LanguagesRunner(ModeRunner):
+    mode_key = "lang"
+    columns = LANGUAGE_COLUMNS
+
+    def process_one(self, drv, row):
+        course, languages = row
+        return (course,) + self._update_languages(drv, course, languages)
+
+    def _update_languages(self, drv, course_name:str, langs:List[str]) -> Tuple[str, str]:
+        return _edit_course(drv, course_name, None, langs, self.log, self.dry_run)
+
+
+class CourseUpdateRunner(ModeRunner):
+    """Review date and languages in one edit session: open once, apply all, save once."""
+    mode_key = "course"
+    columns = COURSE_UPDATE_COLUMNS
+    require_any = ("date", "languages")
+
+    def process_one(self, drv, row):
+        course, date_str, languages = row
+        res = None
+        if not languages:
+            res = self.via_http(course, lambda h: h.update_course(course, date_str=date_str, dry_run=self.dry_run))
+        return (course,) + (res or self._update_course(drv, course, date_str, languages))
+
+    def _update_course(self, drv, course_name:str, date_str:Optional[str], langs:Optional[List[str]]) -> Tuple[str, str]:
+        return _edit_course(drv, course_name, date_str, langs, self.log, self.dry_run)
+
+
+class PasswordResetRunner(ModeRunner):
+    mode_key = "pwd"
+    columns = PASSWORD_COLUMNS
+    has_secrets = True
+    url = URL_USER_ADMIN
+    ready_locator = (By.ID, ID_USER_SEARCH_BOX)
+    login_msg = "Log in to LKQYou PROD (User Admin), then click OK in this dialog."
+    failed_header = ["Username", "Error Message"]
+    full_header = ["Username", "Status", "Message"]
+
+    def process_one(self, drv, row):
+        user, pwd = row
+        res = self.via_http(user, lambda h: h.reset_password(user, pwd, dry_run=self.dry_run))
+        return (user,) + (res or self._reset_one(drv, user, pwd))
+
+
+    def _reset_one(self, drv, user: str, pwd: str) -> Tuple[str, str]:
+        wait = WebDriverWait(drv, DEFAULT_TIMEOUT)
+        with TRACER.span("user search"):
+            _check_session(drv)
+            try:
+                sb = wait.until(EC.presence_of_element_located((By.ID, ID_USER_SEARCH_BOX)))
+            except TimeoutException:
+                return ROW_FAILED, "User search box not found"
+
+            sb.clear()
+            sb.send_keys(user)
+            with PostbackWatch(drv, "user search"):
+                sb.send_keys(Keys.RETURN)
+
+            if not drv.find_elements(By.ID, ID_USER_ROW_OPTIONS):
+                return ROW_FAILED, f"User '{user}' not found"
+
+        if self.dry_run:
+            return ROW_PLANNED, "Password would be reset"
+
+        with TRACER.span("options menu"):
+            menu = wait.until(EC.element_to_be_clickable((By.CLASS_NAME, CLASS_USER_OPTIONS_BTN)))
+            _safe_js_click(drv, menu)
+
+            pwd_link = _timed_wait(drv, "user options menu", EC.element_to_be_clickable((By.ID, ID_PASSWORD_CHANGE_LINK)))
+            _safe_js_click(drv, pwd_link)
+
+        with TRACER.span("password dialog"):
+            try:
+                radio = _timed_wait(drv, "password dialog", EC.element_to_be_clickable((By.ID, ID_PASSWD_MANUAL_RADIO)))
+                _safe_js_click(drv, radio)
+            except TimeoutException:
+                return ROW_FAILED, "Manual reset radio not found"
+
+        with TRACER.span("confirm OK"):
+            _click_ok_in_pwd_reset(drv)
+
+        with TRACER.span("password fields"):
+            try:
+                new_box = _timed_wait(drv, "password fields", EC.presence_of_element_located((By.ID, ID_PASSWD_NEW_BOX)))
+            except TimeoutException:
+                return ROW_FAILED, "Password fields did not load"
+
+            new_box.clear()
+            new_box.send_keys(pwd)
+            confirm_box = wait.until(EC.presence_of_element_located((By.ID, ID_PASSWD_CONFIRM_BOX)))
+            confirm_box.clear()
+            confirm_box.send_keys(pwd)
+
+        with TRACER.span("password save"):
+            save_btn = wait.until(EC.element_to_be_clickable((By.ID, ID_PASSWD_SAVE_BTN)))
+            _safe_js_click(drv, save_btn)
+            # first of: validation error, confirmation message, dialog closed
+            outcome, text = _wait_pwd_outcome(drv)
+
+        # 🛑 Validation error ("cannot reuse password", complexity, ...): close the dialog for the next user
+        if outcome == "error":
+            if "same" in text.lower():
+                self.log(f"⚠️ Password reuse error for {user}: {text}")
+            else:
+                self.log(f"⚠️ Password rejected for {user}: {text}")
+            try:
+                with TRACER.span("reuse cancel"):
+                    cancel_btn = drv.find_element(By.XPATH, "//a[normalize-space()='Cancel'] | //button[normalize-space()='Cancel']")
+                    _safe_js_click(drv, cancel_btn)
+                    _timed_wait(drv, "password cancel", EC.invisibility_of_element_located((By.ID, ID_PASSWD_NEW_BOX)), 5)
+            except Exception:
+                self.log("⚠️ Could not click Cancel button after password error.")
+            return ROW_FAILED, text
+
+        if outcome in ("success", "closed"):
+            return ROW_SUCCESS,"Password reset confirmed"
+        return ROW_SUCCESS,"No confirmation detected (assumed success)"
+
+
+RUNNERS = {cls.mode_key: cls for cls in (ReviewDateRunner, LanguagesRunner, CourseUpdateRunner, PasswordResetRunner)}
+
+
+# ================================================================
+# Export utility (shared across modes)
+# ================================================================
+
+def _export_generic(path:str, header:List[str], rows:Iterable[Tuple]):
+    """Write rows (any iterable, consumed once) as CSV or a write-only (streaming) xlsx."""
+    ext=os.path.splitext(path)[1].lower()
+    if ext=='.csv':
+        with open(path,'w',newline='',encoding='utf-8') as f:
+            w=csv.writer(f); w.writerow(header); w.writerows(rows)
+    else:
+        wb=openpyxl.Workbook(write_only=True); ws=wb.create_sheet('Report'); ws.append(header)
+        for r in rows: ws.append(list(r))
+        wb.save(path)
+
+
+class ResultWriter:
+    """Results file written while the run goes: one flushed CSV line per finished row.
+
+    Rows are in completion order and only the open file handle is held, so memory stays
+    flat and everything finished so far survives a crash. Exports copy or convert it.
+    """
+    def __init__(self, path: str, header: List[str]):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self._fh = open(path, "w", newline="", encoding="utf-8")
+        self._csv = csv.writer(self._fh)
+        self._csv.writerow(header)
+        self._fh.flush()
+
+    @classmethod
+    def for_run(cls, mode: str, header: List[str]) -> "ResultWriter":
+        return cls(os.path.join(RESULTS_DIR, f"{mode}_{time.strftime('%Y%m%d_%H%M%S')}.csv"), header)
+
+    def write(self, key: str, status: str, msg: str):
+        """Not thread-safe; only the run's writer stage calls it."""
+        self._csv.writerow([key, status.title(), msg])
+        self._fh.flush()
+
+    def close(self):
+        if not self._fh.closed:
+            self._fh.close()
+
+
+def _read_results(path: str, statuses: Optional[Tuple[str, ...]] = None, columns: Optional[Tuple[int, ...]] = None) -> Iterator[list]:
+    """Data rows of a ResultWriter file, optionally only given (title-case) statuses / columns."""
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = csv.reader(f)
+        next(rows, None)
+        for row in rows:
+            if statuses and (len(row) < 2 or row[1] not in statuses):
+                continue
+            yield [row[i] for i in columns] if columns else row
+
+
+def _copy_results(src: str, dest: str, header: List[str], statuses: Optional[Tuple[str, ...]] = None,
+                  columns: Optional[Tuple[int, ...]] = None):
+    """Export a results file: plain file copy for an unfiltered CSV, else a streamed conversion."""
+    if not src:
+        _export_generic(dest, header, [])  # no rows were processed (e.g. login failed)
+        return
+    if os.path.abspath(src) == os.path.abspath(dest):
+        return
+    if not statuses and not columns and os.path.splitext(dest)[1].lower() == ".csv":
+        with open(src, newline="", encoding="utf-8") as f_in, open(dest, "w", newline="", encoding="utf-8") as f_out:
+            next(f_in, None)
+            csv.writer(f_out).writerow(header)
+            shutil.copyfileobj(f_in, f_out)
+        return
+    _export_generic(dest, header, _read_results(src, statuses, columns))
+
+
+# ================================================================
+# User-load feed (Username | NewPassword workbook -> CSOD data-load files)
+# ================================================================
+class FeedReport(NamedTuple):
+    files: List[str]                 # written feed files, in order
+    written: int                     # users in them
+    rejected: List[Tuple[str, str]]  # (username, reason) left out
+    problems: List[str]              # findings of the validation pass over the written files
+
+
+def _feed_problem(user: str, pwd: str) -> Optional[str]:
+    """Why (user, pwd) cannot go into a feed file; None if it can."""
+    if not user or not pwd:
+        return "Username or password missing"
+    if any(ord(ch) < 32 for ch in user + pwd):
+        return "Control character or line break in username / password"
+    if len(pwd) < FEED_PASSWORD_MIN:
+        return f"Password shorter than {FEED_PASSWORD_MIN} characters"
+    if pwd.lower() == user.lower():
+        return "Password equals the username"
+    return None
+
+
+def _feed_line(values: Iterable[str]) -> str:
+    buf = io.StringIO()
+    csv.writer(buf, delimiter=FEED_DELIMITER, lineterminator="\r\n").writerow(values)
+    return buf.getvalue()
+
+
+def validate_feed_file(path: str, seen: Optional[set] = None, max_rows: int = FEED_MAX_ROWS,
+                       max_bytes: int = FEED_MAX_BYTES) -> List[str]:
+    """Re-read a written feed file and check it the way the data load will: header,
+    field count, empty values, size limits and user IDs repeated across the batch (seen)."""
+    seen = set() if seen is None else seen
+    name = os.path.basename(path)
+    problems = []
+    if os.path.getsize(path) > max_bytes:
+        problems.append(f"{name}: larger than {max_bytes} bytes")
+    with open(path, newline="", encoding=FEED_ENCODING) as f:
+        rows = csv.reader(f, delimiter=FEED_DELIMITER)
+        if tuple(next(rows, ())) != tuple(FEED_HEADER):
+            problems.append(f"{name}: header is not {FEED_DELIMITER.join(FEED_HEADER)}")
+        count = 0
+        for line, row in enumerate(rows, 2):
+            count += 1
+            if len(row) != len(FEED_HEADER) or not all(row):
+                problems.append(f"{name} line {line}: expected {len(FEED_HEADER)} non-empty fields")
+            elif row[0].lower() in seen:
+                problems.append(f"{name} line {line}: user '{row[0]}' is already in this batch")
+            else:
+                seen.add(row[0].lower())
+    if count > max_rows:
+        problems.append(f"{name}: {count} rows (limit {max_rows})")
+    return problems
+
+
+def build_user_feed(excel_path: str, out_dir: str = FEED_DIR, log=print, max_rows: int = FEED_MAX_ROWS,
+                    max_bytes: int = FEED_MAX_BYTES) -> FeedReport:
+    """Turn a Username | NewPassword workbook into user-load files for one bulk import.
+
+    Rows go through the pre-flight check and the password rules of _feed_problem(); the
+    rest is split into files of at most max_rows rows / max_bytes bytes, which are then
+    read back by validate_feed_file(). Raises on an unreadable workbook.
+    """
+    pre = preflight_rows(WorkbookRows(excel_path, PASSWORD_COLUMNS, log), [c.field for c in PASSWORD_COLUMNS], log)
+    rejected = list(pre.rejected)
+    os.makedirs(out_dir, exist_ok=True)
+    stem = os.path.join(out_dir, f"user_feed_{time.strftime('%Y%m%d_%H%M%S')}")
+    header = _feed_line(FEED_HEADER).encode(FEED_ENCODING)
+    files: List[str] = []
+    fh, rows_in, bytes_in, written = None, 0, 0, 0
+    try:
+        for _, (user, pwd) in pre.rows:
+            problem = _feed_problem(user, pwd)
+            if problem:
+                rejected.append((user, problem))
+                log(f"❌ {user}: {problem}")
+                continue
+            line = _feed_line((user, pwd)).encode(FEED_ENCODING)
+            if fh is None or rows_in >= max_rows or bytes_in + len(line) > max_bytes:
+                if fh:
+                    fh.close()
+                files.append(f"{stem}_part{len(files) + 1:02d}.csv")
+                fh = open(files[-1], "wb")
+                fh.write(header)
+                rows_in, bytes_in = 0, len(header)
+            fh.write(line)
+            rows_in += 1; bytes_in += len(line); written += 1
+    finally:
+        if fh:
+            fh.close()
+    seen: set = set()
+    problems = [p for path in files for p in validate_feed_file(path, seen, max_rows, max_bytes)]
+    for p in problems:
+        log(f"❌ Feed check: {p}")
+    log(f"📦 Feed: {written} user(s) in {len(files)} file(s) in {out_dir}, {len(rejected)} rejected"
+        + ("" if problems else "; validation passed"))
+    if files:
+        log("⚠️ Feed files contain plain-text passwords: delete them once the import is done.")
+    return FeedReport(files, written, rejected, problems)
+
+
+# ================================================================
+# Sharded runs (split by a stable key hash, claim shards, merge results)
+# ================================================================
+def shard_of(key: str, shards: int) -> int:
+    """Stable shard number (0-based) of a row key: the same course / user lands in the same
+    shard on every host and every run, so two shards never edit the same item."""
+    return int(hashlib.sha1(key.strip().lower().encode("utf-8")).hexdigest()[:8], 16) % shards
+
+
+def split_workbook(excel_path: str, columns: Tuple[Column, ...], shards: int, out_dir: str = SHARD_DIR,
+                   log=print, require_any: Tuple[str, ...] = ()) -> List[str]:
+    """Write the rows of excel_path into `shards` workbooks by shard_of(key); returns their paths.
+
+    A manifest remembers which workbook the shards came from: splitting the same workbook
+    again re-uses the existing files, so every shard's journal still resumes.
+    """
+    stem = os.path.splitext(os.path.basename(excel_path))[0]
+    paths = [os.path.join(out_dir, f"{stem}_shard{i}of{shards}.xlsx") for i in range(1, shards + 1)]
+    manifest = os.path.join(out_dir, f"{stem}_shards{shards}.json")
+    source = file_hash(excel_path)
+    try:
+        with open(manifest, encoding="utf-8") as f:
+            if json.load(f).get("source") == source and all(os.path.exists(p) for p in paths):
+                log(f"🧩 Re-using the {shards} shard(s) of an earlier split of this workbook.")
+                return paths
+    except (OSError, ValueError):
+        pass
+    os.makedirs(out_dir, exist_ok=True)
+    books = []
+    for _ in paths:
+        wb = openpyxl.Workbook(write_only=True)
+        ws = wb.create_sheet("Rows")
+        ws.append([c.headers[0] for c in columns])
+        books.append((wb, ws))
+    counts = [0] * shards
+    for row in WorkbookRows(excel_path, columns, log, require_any):
+        i = shard_of(row[0], shards)
+        books[i][1].append([", ".join(v) if isinstance(v, list) else v for v in row])
+        counts[i] += 1
+    for (wb, _), path in zip(books, paths):
+        wb.save(path)
+    tmp = manifest + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"workbook": excel_path, "source": source, "files": paths, "rows": counts}, f, indent=1)
+    os.replace(tmp, manifest)
+    log(f"🧩 Split {sum(counts)} row(s) into {shards} shard(s): {', '.join(map(str, counts))}")
+    return paths
+
+
+def remove_shards(paths: List[str], log=print):
+    """Delete shard workbooks (e.g. ones holding passwords); their results files are kept.
+    The next split of the source workbook writes them again."""
+    for path in paths:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            log(f"⚠️ Could not delete {path}: {e}")
+    log(f"🧹 Deleted {len(paths)} shard workbook(s) holding passwords.")
+
+
+def shard_results_path(shard_path: str) -> str:
+    return os.path.splitext(shard_path)[0] + ".results.csv"
+
+
+def claim_shard(shard_path: str, force: bool = False) -> bool:
+    """Create shard_path's lock file (host + pid); False if another process / host holds it."""
+    lock = shard_path + ".lock"
+    if force and os.path.exists(lock):
+        os.remove(lock)
+    try:
+        fd = os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+    except FileExistsError:
+        return False
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(f"{socket.gethostname()} {os.getpid()} {time.strftime('%Y-%m-%d %H:%M:%S')}\n")
+    return True
+
+
+def release_shard(shard_path: str):
+    try:
+        os.remove(shard_path + ".lock")
+    except OSError:
+        pass
+
+
+def merge_results(paths: List[str], dest: str, header: List[str], failed_dest: Optional[str] = None,
+                  failed_header: Optional[List[str]] = None) -> Dict[str, int]:
+    """One report (CSV or xlsx, as _export_generic) from per-shard results files; returns the
+    row count per status. failed_dest optionally gets the failed rows only (key, message)."""
+    counts: Dict[str, int] = collections.Counter()
+    def rows():
+        for path in paths:
+            for row in _read_results(path):
+                counts[row[1] if len(row) > 1 else ""] += 1
+                yield row
+    _export_generic(dest, header, rows())
+    if failed_dest:
+        _export_generic(failed_dest, failed_header or [header[0], "Error"],
+                        (r for path in paths for r in _read_results(path, (ROW_FAILED.title(),), (0, 2))))
+    return dict(counts)
@@ -0,0 +1,483 @@
+"""
+Tk front-end of the CSOD toolkit: one frame per mode, swapped by radio buttons.
+
+The batch logic lives in csod_core's ModeRunner classes; the frames only collect
+options, show the log/progress and offer the export dialogs.
+"""
+
+import os
+import time
+import queue
+import shutil
+import importlib
+import threading
+from typing import Callable, List, Optional, Tuple
+
+import tkinter as tk
+from tkinter import filedialog, messagebox, ttk, scrolledtext
+
+# csod_core (Selenium, openpyxl, ...) is imported by main() in a background thread
+# while the window is already on screen; the classes below only run after that.
+core = None
+
+
+# ================================================================
+# Base Mode Frame
+# ================================================================
+class ModeFrame(tk.Frame):
+    """Common UI bits for all modes."""
+    # Dialog wording / default file names; set per subclass
+    failed_noun = "failed courses"
+    failed_prompt = ("Export Failed Courses", "Save failed course list now?")
+    full_prompt = ("Export All Results", "Save full results (success + failed)?")
+    failed_dialog = ("Save Failed Courses", "failed_courses", ".csv")      # title, file prefix, default ext
+    full_dialog = ("Save Course Update Results", "course_results", ".xlsx")
+
+    def __init__(self, master, label_text: str, runner: "core.ModeRunner"):
+        super().__init__(master)
+        self.runner = runner
+        self.runner.log = self.tlog
+        self.browser = runner.browser
+        self.excel_path: Optional[str] = None
+        self.thread: Optional[threading.Thread] = None
+        self._watch_progress = False  # redraw the progress panel until the run's final numbers are shown
+
+        # Top: file selector
+        browse_frame = tk.Frame(self)
+        browse_frame.pack(pady=5, anchor='w')
+        tk.Button(browse_frame, text="Browse Excel", command=self.browse_file).pack(side=tk.LEFT, padx=5)
+        self.file_label = tk.Label(browse_frame, text="No file selected", fg="gray")
+        self.file_label.pack(side=tk.LEFT)
+
+        # Start/Cancel row
+        ctrl_frame = self.ctrl_frame = tk.Frame(self)
+        ctrl_frame.pack(pady=5, anchor='w')
+        self.start_btn = tk.Button(ctrl_frame, text="Start", width=12, command=self.start)
+        self.start_btn.grid(row=0, column=0, padx=4)
+        self.cancel_btn = tk.Button(ctrl_frame, text="Cancel", width=12, state=tk.DISABLED, command=self.cancel)
+        self.cancel_btn.grid(row=0, column=1, padx=4)
+        tk.Label(ctrl_frame, text="Workers").grid(row=0, column=2, padx=(12,2))
+        self.workers_var = tk.IntVar(value=core.POOL_WORKERS)
+        tk.Spinbox(ctrl_frame, from_=1, to=core.POOL_MAX_WORKERS, width=4, textvariable=self.workers_var).grid(row=0, column=3)
+        self.http_var = tk.BooleanVar(value=core.HTTP_ENGINE_ENABLED)
+        tk.Checkbutton(ctrl_frame, text="HTTP engine", variable=self.http_var).grid(row=1, column=2, columnspan=2, padx=(12,0), pady=(6,0), sticky='w')
+        self.trace_var = tk.BooleanVar(value=core.TRACE_ENABLED)
+        tk.Checkbutton(ctrl_frame, text="Trace steps", variable=self.trace_var).grid(row=0, column=4, padx=(12,0), sticky='w')
+        self.dry_run_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(ctrl_frame, text="Dry run", variable=self.dry_run_var).grid(row=1, column=4, padx=(12,0), pady=(6,0), sticky='w')
+
+        # Export row (enabled post‑run)
+        self.export_fail_btn = tk.Button(ctrl_frame, text="Download Failed", width=16, state=tk.DISABLED, command=self.export_failed_dialog)
+        self.export_fail_btn.grid(row=1, column=0, padx=4, pady=(6,0))
+        self.export_all_btn = tk.Button(ctrl_frame, text="Download Full Results", width=16, state=tk.DISABLED, command=self.export_full_dialog)
+        self.export_all_btn.grid(row=1, column=1, padx=4, pady=(6,0))
+
+        # Progress: bar + panel, redrawn from runner.progress on the Tk thread
+        self.progress = ttk.Progressbar(self, length=450, mode='determinate')
+        self.progress.pack(pady=(6,0), anchor='w')
+        self.stats_label = tk.Label(self, text="", anchor='w', justify=tk.LEFT)
+        self.stats_label.pack(fill=tk.X, padx=2)
+        self.step_label = tk.Label(self, text="", anchor='w', fg="gray")
+        self.step_label.pack(fill=tk.X, padx=2, pady=(0,6))
+
+        # Log area
+        tk.Label(self, text=label_text, font=("Helvetica", 12, "bold")).pack(anchor='w')
+        self.log_box = scrolledtext.ScrolledText(self, width=80, height=18)
+        self.log_box.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        self.log_pipe = core.LogPipeline(runner.mode_key)
+        self._ui_calls: "queue.SimpleQueue" = queue.SimpleQueue()  # dialogs requested by the run thread
+        self.after(core.LOG_TICK_MS, self._drain_log)
+        self.after(core.PROGRESS_REFRESH_MS, self._refresh_progress)
+
+    @property
+    def success_items(self) -> List[str]:
+        return self.runner.success_items
+
+    @property
+    def failed_items(self) -> List[Tuple[str, str]]:
+        return self.runner.failed_items
+
+    # --- Logging helpers ---
+    def log(self, msg: str):
+        self.log_pipe.put(msg)
+    def tlog(self, msg: str):  # thread‑safe
+        self.log_pipe.put(msg)
+
+    def _on_ui(self, fn: Callable, *args):
+        """Run fn(*args) (e.g. a messagebox) on the Tk thread at the next tick and wait for it; thread-safe."""
+        done, box = threading.Event(), []
+        self._ui_calls.put((fn, args, done, box))
+        done.wait()
+        return box[0] if box else None
+
+    def _drain_log(self):
+        """Tk tick: append pending lines in one insert and trim the widget to its last N lines."""
+        lines = self.log_pipe.drain()
+        if lines:
+            self.log_box.insert(tk.END, "\n".join(lines) + "\n")
+            excess = int(self.log_box.index('end-1c').split('.')[0]) - 1 - core.LOG_WIDGET_MAX_LINES
+            if excess > 0:
+                self.log_box.delete('1.0', f'{excess + 1}.0')
+            self.log_box.see(tk.END)
+        while not self._ui_calls.empty():
+            fn, args, done, box = self._ui_calls.get()
+            try:
+                box.append(fn(*args))
+            finally:
+                done.set()
+        self.after(core.LOG_TICK_MS, self._drain_log)
+
+    def _refresh_progress(self):
+        """Tk tick: redraw the bar and panel from the run's progress snapshot (idle frames are skipped)."""
+        if self._watch_progress:
+            snap = self.runner.progress.snapshot()
+            self.progress['value'] = min(snap["done"] / max(snap["total"], 1), 1) * 100
+            self.stats_label.config(text=_progress_text(snap))
+            self.step_label.config(text=f"Now: {snap['step']}")
+            if not snap["running"]:
+                self._watch_progress = False
+        self.after(core.PROGRESS_REFRESH_MS, self._refresh_progress)
+
+    # --- File browse ---
+    def browse_file(self):
+        path = filedialog.askopenfilename(filetypes=[("Excel", "*.xlsx")])
+        if path:
+            self.excel_path = path
+            self.file_label.config(text=os.path.basename(path), fg='black')
+
+    # --- Controls ---
+    def start(self):
+        if not self.excel_path:
+            messagebox.showwarning("No File", "Please select an Excel file first.")
+            return
+        self.runner.dry_run = bool(self.dry_run_var.get())
+        if self.runner.dry_run:
+            self.runner.journal = None; self.runner.resume = {}  # nothing is saved, so nothing to resume
+        elif not self._prepare_journal():
+            return
+        try:
+            self.runner.workers = int(self.workers_var.get())
+        except (tk.TclError, ValueError):
+            self.runner.workers = 1
+        self.runner.use_http = bool(self.http_var.get())
+        self.runner.trace = bool(self.trace_var.get())
+        self.progress['value'] = 0
+        self.runner.progress.reset()
+        self._watch_progress = True
+        self.log_pipe.clear()
+        self.log_box.delete(1.0, tk.END)
+        self.start_btn.config(state=tk.DISABLED)
+        self.cancel_btn.config(state=tk.NORMAL)
+        self.export_fail_btn.config(state=tk.DISABLED)
+        self.export_all_btn.config(state=tk.DISABLED)
+        self.thread = threading.Thread(target=self._run_wrapper, daemon=True)
+        self.thread.start()
+
+    def _prepare_journal(self) -> bool:
+        """Open this workbook's journal and offer to resume; False if the user cancelled."""
+        try:
+            done = self.runner.open_journal(self.excel_path)
+        except OSError as e:
+            self.runner.journal = None
+            messagebox.showwarning("Journal Unavailable", f"Progress will not be checkpointed: {e}")
+            return True
+        if not done:
+            return True
+        ans = messagebox.askyesnocancel(
+            "Resume Previous Run",
+            f"{len(done)} row(s) of this workbook were already completed in an earlier run.\n\n"
+            "Yes = resume and skip them\nNo = start over from the first row")
+        if ans is None:
+            return False
+        if ans:
+            self.runner.resume = done
+        else:
+            self.runner.journal.discard()
+        return True
+
+    def cancel(self):
+        self.runner.stop_flag = True
+        self.tlog("⚠️ Cancellation requested...")
+
+    def _run_wrapper(self):  # thread entry
+        # login prompts may come from worker threads (re-login after a crash): shown on the Tk thread
+        status = self.runner.run(self.excel_path,
+                                 prompt=lambda title, text: self._on_ui(messagebox.showinfo, title, text),
+                                 on_error=lambda title, text: self._on_ui(messagebox.showerror, title, text))
+        if status in (core.RUN_SESSION_LOST, core.RUN_INCOMPLETE):
+            why = "the login was lost" if status == core.RUN_SESSION_LOST else "the browser could not be restarted"
+            self._on_ui(messagebox.showwarning, "Run Incomplete",
+                        f"{self.runner.unprocessed} row(s) were not processed because {why}.\n"
+                        "They are listed as failed in the results; click Start again to resume them.")
+        self._on_ui(self._finish)  # buttons and dialogs belong to the Tk thread
+
+    def _finish(self):
+        self.start_btn.config(state=tk.NORMAL)
+        self.cancel_btn.config(state=tk.DISABLED)
+        if self.failed_items:
+            self.export_fail_btn.config(state=tk.NORMAL)
+        self.export_all_btn.config(state=tk.NORMAL)
+        if self.failed_items and messagebox.askyesno(*self.failed_prompt):
+            self.export_failed_dialog()
+        if messagebox.askyesno(*self.full_prompt):
+            self.export_full_dialog()
+
+    # --- Exporters ---
+    def _ask_save_path(self, title: str, prefix: str, ext: str) -> str:
+        types = [("CSV","*.csv"),("Excel","*.xlsx")]
+        if ext == ".xlsx":
+            types.reverse()
+        default = f"{prefix}_{time.strftime('%Y%m%d_%H%M%S')}"
+        return filedialog.asksaveasfilename(title=title, defaultextension=ext, initialfile=default, filetypes=types)
+
+    def export_failed_dialog(self):
+        if not self.failed_items:
+            messagebox.showinfo("No Failures", f"No {self.failed_noun} to export.")
+            return
+        path = self._ask_save_path(*self.failed_dialog)
+        if not path: return
+        self.runner.export_failed(path)
+        self.tlog(f"📤 Failed report saved: {os.path.basename(path)}")
+
+    def export_full_dialog(self):
+        path = self._ask_save_path(*self.full_dialog)
+        if not path: return
+        self.runner.export_full(path)
+        self.tlog(f"📤 Results saved: {os.path.basename(path)}")
+
+
+def _duration(secs: float) -> str:
+    secs = int(secs)
+    return f"{secs // 3600}h {secs % 3600 // 60:02d}m" if secs >= 3600 else f"{secs // 60}m {secs % 60:02d}s"
+
+
+def _progress_text(snap: dict) -> str:
+    """'1,234 / 4,000 rows · 52.3 rows/min · ETA 53m 10s (≈ 15:42) · ✅ 1,200 ❌ 30 ⏭️ 4'"""
+    parts = [f"{snap['done']:,} / {snap['total']:,} rows", f"{snap['rate_per_min']:.1f} rows/min"]
+    if snap["eta_secs"] is not None:
+        end = time.localtime(time.time() + snap["eta_secs"])
+        clock = time.strftime("%H:%M" if end.tm_yday == time.localtime().tm_yday else "%a %H:%M", end)
+        parts.append(f"ETA {_duration(snap['eta_secs'])} (≈ {clock})")
+    elif not snap["running"]:
+        parts.append(f"took {_duration(snap['elapsed_secs'])}")
+    counts = [("✅", snap["success"] or snap["planned"]), ("❌", snap["failed"] + snap["rejected"]),
+              ("⏭️", snap["skipped"]), ("↩️ resumed", snap["resumed"])]
+    parts.append(" ".join(f"{icon} {n:,}" for icon, n in counts if n or icon in ("✅", "❌")))
+    return " · ".join(parts)
+
+
+# ================================================================
+# Review Date Mode
+# ================================================================
+class ReviewDateFrame(ModeFrame):
+    def __init__(self, master, browser: "core.BrowserManager"):
+        super().__init__(master, "Review Date Log", core.ReviewDateRunner(browser))
+
+
+# ================================================================
+# Languages Mode
+# ================================================================
+class LanguagesFrame(ModeFrame):
+    failed_dialog = ("Save Failed Languages", "failed_languages", ".csv")
+    full_dialog = ("Save Language Update Results", "language_results", ".xlsx")
+
+    def __init__(self, master, browser: "core.BrowserManager"):
+        super().__init__(master, "Languages Log", core.LanguagesRunner(browser))
+
+
+# ================================================================
+# Combined Course Update Mode (review date + languages, one save)
+# ================================================================
+class CourseUpdateFrame(ModeFrame):
+    failed_dialog = ("Save Failed Course Updates", "failed_course_updates", ".csv")
+    full_dialog = ("Save Course Update Results", "course_update_results", ".xlsx")
+
+    def __init__(self, master, browser: "core.BrowserManager"):
+        super().__init__(master, "Course Update Log", core.CourseUpdateRunner(browser))
+
+
+# ================================================================
+# Password Reset Mode (adapted from refactored standalone)
+# ================================================================
+class PasswordResetFrame(ModeFrame):
+    failed_noun = "failed password resets"
+    failed_prompt = ("Export Failed Passwords", "Save failed password reset report now?")
+    full_prompt = ("Export All Results", "Save full password reset summary?")
+    failed_dialog = ("Save Failed Password Resets", "failed_password_reset", ".xlsx")
+    full_dialog = ("Save Password Reset Results", "password_reset_results", ".xlsx")
+
+    def __init__(self, master, browser: "core.BrowserManager"):
+        super().__init__(master, "Password Reset Log", core.PasswordResetRunner(browser))
+        self._in_memory_pwds: List[Tuple[str,str]] = []  # keep until end; not exported normally
+        # Bulk alternative: the same workbook as CSOD user-load files (no browser)
+        self.feed_btn = tk.Button(self.ctrl_frame, text="Build Feed File", width=14, command=self.build_feed)
+        self.feed_btn.grid(row=0, column=5, padx=(12,0))
+
+    # override start to clear pwds too
+    def start(self):
+        self._in_memory_pwds.clear()
+        super().start()
+
+    def build_feed(self):
+        if not self.excel_path:
+            messagebox.showwarning("No File", "Please select an Excel file first.")
+            return
+        out_dir = filedialog.askdirectory(title="Folder for the user-load feed files", initialdir=core.APP_DIR)
+        if not out_dir:
+            return
+        self.log_pipe.clear()
+        self.log_box.delete(1.0, tk.END)
+        self.feed_btn.config(state=tk.DISABLED)
+        self.start_btn.config(state=tk.DISABLED)
+        # big workbooks take a while: read / write / validate off the Tk thread, report back on it
+        _in_background(self, lambda: core.build_user_feed(self.excel_path, out_dir, self.tlog),
+                       lambda report, error: self._feed_done(report, error, out_dir))
+
+    def _feed_done(self, report, error, out_dir: str):
+        self.feed_btn.config(state=tk.NORMAL)
+        self.start_btn.config(state=tk.NORMAL)
+        if error is not None:
+            messagebox.showerror("Feed File", f"Could not read the workbook: {error}")
+            return
+        text = f"{report.written} user(s) written to {len(report.files)} file(s) in {out_dir}."
+        if report.rejected or report.problems:
+            messagebox.showwarning("Feed File", f"{text}\n{len(report.rejected)} row(s) rejected, "
+                                   f"{len(report.problems)} validation problem(s): see the log.")
+        else:
+            messagebox.showinfo("Feed File", f"{text}\nUpload them with the CSOD user data load, then delete them "
+                                "(they contain the passwords).")
+
+
+# ================================================================
+# Main Application Shell (radio to swap frames)
+# ================================================================
+class MultiModeApp:
+    def __init__(self, root: tk.Tk):
+        self.root = root
+        self.root.title("LKQYou Multi‑Purpose Automation Toolkit")
+        remember = os.path.isdir(core.GUI_PROFILE_DIR)
+        self.browser = core.BrowserManager(profile_dir=core.GUI_PROFILE_DIR if remember else None)
+
+        # Menu (close browser)
+        menubar = tk.Menu(self.root)
+        browser_menu = tk.Menu(menubar, tearoff=0)
+        browser_menu.add_command(label="Close Browser", command=self.browser.close)
+        self.remember_var = tk.BooleanVar(value=remember)
+        browser_menu.add_checkbutton(label="Remember Login", variable=self.remember_var, command=self._toggle_remember_login)
+        browser_menu.add_command(label="Clear Course Index Cache", command=self._clear_course_index)
+        menubar.add_cascade(label="Browser", menu=browser_menu)
+        self.root.config(menu=menubar)
+
+        # Mode radios
+        self.mode_var = tk.StringVar(value='review')
+        mode_frame = tk.Frame(root)
+        mode_frame.pack(anchor='w', pady=(5,0), padx=5)
+        tk.Radiobutton(mode_frame,text="Update Review Date",variable=self.mode_var,value='review',command=self._swap_mode).pack(side=tk.LEFT,padx=5)
+        tk.Radiobutton(mode_frame,text="Update Available Languages",variable=self.mode_var,value='lang',command=self._swap_mode).pack(side=tk.LEFT,padx=5)
+        tk.Radiobutton(mode_frame,text="Update Course (Date + Languages)",variable=self.mode_var,value='course',command=self._swap_mode).pack(side=tk.LEFT,padx=5)
+        tk.Radiobutton(mode_frame,text="Password Reset",variable=self.mode_var,value='pwd',command=self._swap_mode).pack(side=tk.LEFT,padx=5)
+
+        # Container for frames
+        self.container = tk.Frame(root)
+        self.container.pack(fill=tk.BOTH, expand=True)
+
+        # Instantiate frames
+        self.review_frame = ReviewDateFrame(self.container, self.browser)
+        self.lang_frame   = LanguagesFrame(self.container, self.browser)
+        self.course_frame = CourseUpdateFrame(self.container, self.browser)
+        self.pwd_frame    = PasswordResetFrame(self.container, self.browser)
+
+        for f in (self.review_frame, self.lang_frame, self.course_frame, self.pwd_frame):
+            f.place(relx=0, rely=0, relwidth=1, relheight=1)
+
+        self._swap_mode()  # show default
+
+        # handle close
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+
+    def _swap_mode(self):
+        m = self.mode_var.get()
+        if m=='review':
+            self.review_frame.lift()
+        elif m=='lang':
+            self.lang_frame.lift()
+        elif m=='course':
+            self.course_frame.lift()
+        else:
+            self.pwd_frame.lift()
+
+    def _toggle_remember_login(self):
+        """On: the main Chrome keeps its profile (and so the CSOD login) in GUI_PROFILE_DIR across starts."""
+        if self.remember_var.get():
+            os.makedirs(core.GUI_PROFILE_DIR, exist_ok=True)
+            self.browser.profile_dir = core.GUI_PROFILE_DIR
+            if self.browser.driver is not None:
+                messagebox.showinfo("Remember Login", "Takes effect with the next browser start "
+                                    "(Browser > Close Browser). Log in once more then; later starts reuse it.")
+            return
+        if not messagebox.askyesno("Remember Login", "Close the browser and delete the saved login?"):
+            self.remember_var.set(True)
+            return
+        self.browser.close()
+        self.browser.profile_dir = None
+        shutil.rmtree(core.GUI_PROFILE_DIR, ignore_errors=True)
+
+    def _clear_course_index(self):
+        if core.COURSE_INDEX and messagebox.askyesno("Clear Course Index", "Forget all cached course edit pages?"):
+            core.COURSE_INDEX.clear()
+
+    def on_close(self):
+        # attempt to close browser
+        self.browser.close()
+        self.root.destroy()
+
+
+def _in_background(root: tk.Tk, work: Callable, done: Callable, poll_ms: int = 30):
+    """Run work() on a daemon thread; done(result, error) is then called on the Tk thread."""
+    box = {}
+    def target():
+        try:
+            box["result"] = work()
+        except Exception as e:
+            box["error"] = e
+    t = threading.Thread(target=target, daemon=True)
+    t.start()
+    def poll():
+        if t.is_alive():
+            root.after(poll_ms, poll)
+        else:
+            done(box.get("result"), box.get("error"))
+    root.after(poll_ms, poll)
+
+
+def main(update_check: Optional[Callable[[], List[str]]] = None):
+    """Show the window at once, import csod_core behind a "Loading…" label, then build the app.
+
+    update_check (Automate.auto_update) runs on a background thread; if it staged new
+    files the user is told they apply on the next start.
+    """
+    root = tk.Tk()
+    root.geometry("500x500")
+    # root.minsize(500, 500)
+    root.title("LKQYou Multi‑Purpose Automation Toolkit")
+    loading = tk.Label(root, text="Loading…", fg="gray")
+    loading.pack(expand=True)
+
+    def loaded(module, error):
+        global core
+        if error:
+            messagebox.showerror("Startup Error", f"Could not load the toolkit: {error}")
+            root.destroy()
+            return
+        core = module
+        loading.destroy()
+        MultiModeApp(root)
+    _in_background(root, lambda: importlib.import_module("csod_core"), loaded)
+
+    def updated(names, error):
+        if names:
+            messagebox.showinfo("Update Downloaded", f"A new version ({', '.join(names)}) was downloaded.\n"
+                                "It will be used the next time you start the toolkit.")
+    if update_check:
+        _in_background(root, update_check, updated, poll_ms=500)
+    root.mainloop()
@@ -0,0 +1,295 @@
+"""
+Local stand-in for the CSOD admin pages the toolkit drives (development / benchmarking only).
+
+Serves the catalog search, course edit and user admin pages with the element IDs
+from csod_core, as plain WebForms-style posts (__VIEWSTATE, submit buttons), so
+both the Selenium path and the HTTP engine run against it unchanged. Latency,
+injected server errors and password-reuse errors are configurable.
+
+    python csod_mock.py --port 8765 --latency 0.2
+    set CSOD_BASE_URL=http://127.0.0.1:8765   (then run the toolkit / csod_bench.py)
+"""
+
+import re
+import html
+import time
+import random
+import argparse
+import threading
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+# Paths match the production URLs in csod_core (only the host differs)
+PATH_COURSE_SEARCH = "/LMS/admin/catalog/NewUI/search.aspx"
+PATH_COURSE_EDIT   = "/LMS/admin/catalog/NewUI/EditCourse.aspx"
+PATH_USER_ADMIN    = "/admin/Users.aspx"
+
+LANGUAGES = ["English", "Spanish", "French", "German", "Italian", "Portuguese", "Dutch", "Polish",
+             "Japanese", "Chinese (Simplified)", "Korean", "Czech"]
+PWD_HISTORY = 10
+REUSE_ERROR = f"Password cannot be the same as the previous {PWD_HISTORY} passwords."
+
+# Element ids / field names (mirrors csod_core; names use the WebForms '$' style)
+SEARCH_BOX   = ("ctl00_bodyPlaceHolder_ucCatalogSearchFilters_txtSearch", "ctl00$bodyPlaceHolder$ucCatalogSearchFilters$txtSearch")
+SEARCH_BTN   = ("ctl00_bodyPlaceHolder_ucCatalogSearchFilters_btnSearch", "ctl00$bodyPlaceHolder$ucCatalogSearchFilters$btnSearch")
+REVIEW_DATE  = ("CustomFieldControl_dtlCustomField_ctl19_customFieldWrapper_ctl00_dateCtrl_textboxDate",
+                "CustomFieldControl$dtlCustomField$ctl19$customFieldWrapper$ctl00$dateCtrl$textboxDate")
+LANG_PREFIX  = "LanguageControl$LangCB$"
+DATE_RE      = re.compile(r"^\d{1,2}/\d{1,2}/\d{4}$")
+
+_SCRIPT = """<script>
+function __doPostBack(t, a) { var f = document.forms[0]; f.__EVENTTARGET.value = t; f.__EVENTARGUMENT.value = a; f.submit(); }
+function toggle(id) { var e = document.getElementById(id); e.style.display = e.style.display === 'none' ? 'block' : 'none'; }
+function show(id, on) { document.getElementById(id).style.display = on ? 'block' : 'none'; }
+</script>"""
+
+
+class MockCsod:
+    """In-memory tenant plus a threaded HTTP server; start() returns the base URL."""
+    def __init__(self, courses: int = 200, users: int = 200, latency: float = 0.0, jitter: float = 0.0,
+                 error_rate: float = 0.0, reuse_rate: float = 0.0, seed: Optional[int] = None, port: int = 0):
+        self.latency, self.jitter = latency, jitter
+        self.error_rate, self.reuse_rate = error_rate, reuse_rate
+        self.port = port
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        # lo id -> {"title", "date", "langs"}; username -> previous passwords (newest last)
+        self.courses: Dict[str, dict] = {str(1000 + i): {"title": f"Mock Course {i:04d}", "date": "", "langs": ["English"]}
+                                         for i in range(courses)}
+        self.users: Dict[str, List[str]] = {f"mockuser{i:04d}": [] for i in range(users)}
+        self.stats = {"requests": 0, "saves": 0, "resets": 0, "errors_injected": 0, "reuse_errors": 0}
+        self.server: Optional[ThreadingHTTPServer] = None
+
+    # --- lifecycle ---
+    def start(self) -> str:
+        mock = self
+
+        class Handler(_Handler):
+            tenant = mock
+        self.server = ThreadingHTTPServer(("127.0.0.1", self.port), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self.base_url
+
+    def stop(self):
+        if self.server:
+            self.server.shutdown(); self.server.server_close(); self.server = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    # --- behaviour knobs ---
+    def delay(self):
+        d = self.latency + (self.rng.uniform(-self.jitter, self.jitter) if self.jitter else 0.0)
+        if d > 0:
+            time.sleep(d)
+
+    def chance(self, rate: float) -> bool:
+        with self.lock:
+            return rate > 0 and self.rng.random() < rate
+
+    def count(self, key: str):
+        with self.lock:
+            self.stats[key] += 1
+
+    # --- lookups ---
+    def find_course(self, text: str) -> Optional[str]:
+        text = text.strip().lower()
+        for lo_id, c in self.courses.items():
+            if c["title"].lower() == text:
+                return lo_id
+        return None
+
+    def course_by_title(self, title: str) -> Optional[dict]:
+        lo_id = self.find_course(title)
+        return self.courses[lo_id] if lo_id else None
+
+
+class _Handler(BaseHTTPRequestHandler):
+    tenant: MockCsod
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real site
+
+    def log_message(self, *args):
+        pass
+
+    # --- plumbing ---
+    def _send(self, status: int, body: str = "", location: Optional[str] = None):
+        data = body.encode("utf-8")
+        self.send_response(status)
+        if location:
+            self.send_header("Location", location)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        if "MockSession=" not in (self.headers.get("Cookie") or ""):
+            self.send_header("Set-Cookie", "MockSession=1; Path=/; HttpOnly")
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _page(self, title: str, body: str, action: str):
+        viewstate = "%032x" % random.getrandbits(128)
+        self._send(200, f"""<!DOCTYPE html><html><head><title>{html.escape(title)}</title>{_SCRIPT}</head><body>
+<form method="post" action="{html.escape(action)}" id="aspnetForm">
+<input type="hidden" name="__VIEWSTATE" id="__VIEWSTATE" value="{viewstate}">
+<input type="hidden" name="__EVENTVALIDATION" id="__EVENTVALIDATION" value="{viewstate[::-1]}">
+<input type="hidden" name="__EVENTTARGET" id="__EVENTTARGET" value="">
+<input type="hidden" name="__EVENTARGUMENT" id="__EVENTARGUMENT" value="">
+{body}
+</form></body></html>""")
+
+    def _route(self):
+        parts = urllib.parse.urlsplit(self.path)
+        return parts.path.lower(), urllib.parse.parse_qs(parts.query)
+
+    def do_GET(self):
+        t = self.tenant
+        t.count("requests"); t.delay()
+        path, query = self._route()
+        if path == PATH_COURSE_SEARCH.lower():
+            return self._course_search()
+        if path == PATH_COURSE_EDIT.lower():
+            return self._course_edit((query.get("loid") or [""])[0])
+        if path == PATH_USER_ADMIN.lower():
+            return self._user_admin()
+        self._send(404, "<h1>Not Found</h1>")
+
+    def do_POST(self):
+        t = self.tenant
+        t.count("requests")
+        size = int(self.headers.get("Content-Length") or 0)
+        form = {k: v[-1] for k, v in urllib.parse.parse_qs(self.rfile.read(size).decode("utf-8"), keep_blank_values=True).items()}
+        t.delay()
+        if t.chance(t.error_rate):
+            t.count("errors_injected")
+            return self._send(500, "<h1>Server Error in '/' Application.</h1>")
+        path, query = self._route()
+        if path == PATH_COURSE_SEARCH.lower():
+            return self._course_search(form.get(SEARCH_BOX[1], ""))
+        if path == PATH_COURSE_EDIT.lower():
+            return self._course_save((query.get("loid") or [""])[0], form)
+        if path == PATH_USER_ADMIN.lower():
+            if "saveImageButton" in form:
+                return self._password_save(form)
+            return self._user_admin(form.get("userIdText", ""))
+        self._send(404, "<h1>Not Found</h1>")
+
+    # --- catalog ---
+    def _course_search(self, text: Optional[str] = None):
+        body = (f'<input type="text" id="{SEARCH_BOX[0]}" name="{SEARCH_BOX[1]}" value="{html.escape(text or "")}">'
+                f'<input type="submit" id="{SEARCH_BTN[0]}" name="{SEARCH_BTN[1]}" value="Search">')
+        if text is not None:
+            lo_id = self.tenant.find_course(text)
+            if lo_id:
+                c = self.tenant.courses[lo_id]
+                body += f"""
+<table id="ctl00_bodyPlaceHolder_rptTraining"><tr><td>{html.escape(c['title'])}</td><td>
+<a href="#" id="ctl00_bodyPlaceHolder_rptTraining_ctl01_actionMenu" onclick="toggle('ctl00_bodyPlaceHolder_rptTraining_ctl01_btnEdit'); return false;">Actions</a>
+<a id="ctl00_bodyPlaceHolder_rptTraining_ctl01_btnEdit" style="display:none" href="{PATH_COURSE_EDIT}?loid={lo_id}">Edit</a>
+</td></tr></table>"""
+            else:
+                body += "<p>No results found.</p>"
+        self._page("Catalog Search", body, PATH_COURSE_SEARCH)
+
+    def _course_edit(self, lo_id: str, error: str = ""):
+        c = self.tenant.courses.get(lo_id)
+        if not c:
+            return self._send(404, "<h1>Course not found</h1>")
+        boxes = "".join(
+            f'<div><input type="checkbox" id="lang_{i}" name="{LANG_PREFIX}{i}" value="{html.escape(lang)}"{" checked" if lang in c["langs"] else ""}>'
+            f'<label for="lang_{i}">{html.escape(lang)}</label></div>' for i, lang in enumerate(LANGUAGES))
+        summary = f'<div id="ValidationSummary" class="error">{html.escape(error)}</div>' if error else ""
+        self._page("Edit Course", f"""{summary}
+<h1>{html.escape(c['title'])}</h1>
+<label>Review Date</label> <input type="text" id="{REVIEW_DATE[0]}" name="{REVIEW_DATE[1]}" value="{html.escape(c['date'])}">
+<label>Available Languages</label>
+<input type="text" readonly id="LanguageControl_LangCB_Input" value="{html.escape(', '.join(c['langs']))}" onclick="toggle('LanguageControl_LangCB_DropDown')">
+<div id="LanguageControl_LangCB_DropDown" style="display:none">{boxes}</div>
+<input type="submit" id="SubmitButton" name="SubmitButton" value="Save">""", f"{PATH_COURSE_EDIT}?loid={lo_id}")
+
+    def _course_save(self, lo_id: str, form: Dict[str, str]):
+        t = self.tenant
+        c = t.courses.get(lo_id)
+        if not c or "SubmitButton" not in form:
+            return self._course_edit(lo_id)
+        date = form.get(REVIEW_DATE[1], "").strip()
+        if date and not DATE_RE.match(date):
+            return self._course_edit(lo_id, f"Review Date '{date}' is not a valid date (MM/DD/YYYY).")
+        with t.lock:
+            c["date"] = date
+            c["langs"] = [v for k, v in form.items() if k.startswith(LANG_PREFIX)]
+            t.stats["saves"] += 1
+        self._send(303, location=PATH_COURSE_SEARCH)
+
+    # --- users ---
+    def _user_admin(self, user: Optional[str] = None, dialog_error: str = "", notice: str = ""):
+        body = (f'<input type="text" id="userIdText" name="userIdText" value="{html.escape(user or "")}">'
+                f'<input type="submit" id="searchButton" name="searchButton" value="Search">')
+        if notice:
+            body += f'<div class="success">{html.escape(notice)}</div>'
+        if user is not None and user in self.tenant.users:
+            err = f'<span class="error">{html.escape(dialog_error)}</span>' if dialog_error else ""
+            body += f"""
+<input type="hidden" name="hdnUser" value="{html.escape(user)}">
+<table><tr><td>{html.escape(user)}</td><td><div id="rptUsers_ctl00_ddlUserOptions">
+<a href="#" class="CsDropDownBtn" onclick="toggle('userMenu'); return false;">Options</a>
+<div id="userMenu" style="display:none"><a href="#" id="rptUsers_ctl00_ddlUserOptions_lnkPasswordChange" onclick="show('dlgPasswdReset', true); return false;">Change Password</a></div>
+</div></td></tr></table>
+<div id="dlgPasswdReset" style="display:{'block' if dialog_error else 'none'}">
+  <div id="pwdStep1" style="display:{'none' if dialog_error else 'block'}">
+    <input type="radio" id="passwdReset-manual" name="passwdReset" value="manual"> <label for="passwdReset-manual">Set password manually</label>
+    <a href="#" class="cso-btn cso-action backBtnFocus" onclick="show('pwdStep1', false); show('pwdStep2', true); return false;">OK</a>
+  </div>
+  <div id="pwdStep2" style="display:{'block' if dialog_error else 'none'}">
+    {err}
+    <input type="password" id="newPasswordTextBox" name="newPasswordTextBox">
+    <input type="password" id="confirmPasswordTextBox" name="confirmPasswordTextBox">
+    <input type="submit" id="saveImageButton" name="saveImageButton" value="Save">
+    <a href="#" onclick="show('dlgPasswdReset', false); return false;">Cancel</a>
+  </div>
+</div>"""
+        elif user is not None:
+            body += "<p>No users found.</p>"
+        self._page("Users", body, f"{PATH_USER_ADMIN}?tab_page_id=-38")
+
+    def _password_save(self, form: Dict[str, str]):
+        t = self.tenant
+        user, pwd = form.get("hdnUser", ""), form.get("newPasswordTextBox", "")
+        if user not in t.users:
+            return self._user_admin(user)
+        if pwd != form.get("confirmPasswordTextBox", ""):
+            return self._user_admin(user, "The password and confirmation password do not match.")
+        with t.lock:
+            history = t.users[user]
+            reused = pwd in history[-PWD_HISTORY:]
+        if reused or t.chance(t.reuse_rate):
+            t.count("reuse_errors")
+            return self._user_admin(user, REUSE_ERROR)
+        with t.lock:
+            history.append(pwd)
+            t.stats["resets"] += 1
+        self._user_admin(notice=f"Password updated for {user}.")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Local mock of the CSOD admin pages")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--courses", type=int, default=200)
+    ap.add_argument("--users", type=int, default=200)
+    ap.add_argument("--latency", type=float, default=0.0, help="seconds added to every request")
+    ap.add_argument("--jitter", type=float, default=0.0, help="± random seconds on top of --latency")
+    ap.add_argument("--error-rate", type=float, default=0.0, help="fraction of POSTs answered with HTTP 500")
+    ap.add_argument("--reuse-rate", type=float, default=0.0, help="fraction of password saves rejected as reuse")
+    ap.add_argument("--seed", type=int)
+    args = ap.parse_args()
+    mock = MockCsod(args.courses, args.users, args.latency, args.jitter, args.error_rate, args.reuse_rate, args.seed, args.port)
+    print(f"🧪 Mock CSOD on {mock.start()}  (set CSOD_BASE_URL to this; Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        mock.stop()
+
+
+if __name__ == "__main__":
+    main()